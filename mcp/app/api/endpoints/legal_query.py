@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Request, status
+from fastapi.responses import StreamingResponse
 from app.schemas import legalQuery_schema
 from app.crud import legalQuery_crud
+from app.utils.executor import agent_executor
+from app.utils.sse import sse_stream
 
 router = APIRouter(
     prefix="/legalquery",
@@ -9,4 +12,18 @@ router = APIRouter(
 
 @router.post("/", response_model=legalQuery_schema.LegalQueryOutput, status_code=status.HTTP_201_CREATED)
 async def query(query: legalQuery_schema.LegalQueryBase):
-    return legalQuery_crud.query(query)
+    return await agent_executor.run(legalQuery_crud.query, query)
+
+@router.post("/stream")
+async def query_stream(query: legalQuery_schema.LegalQueryBase):
+    """
+    Server-Sent Events variant of the query endpoint. Emits `tool_call`,
+    `tool_result` and `token` events while the agent runs, then a final
+    `done` event with the same payload as the regular endpoint (or `error`).
+    """
+    events = agent_executor.stream(legalQuery_crud.query_stream, query)
+    return StreamingResponse(
+        sse_stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
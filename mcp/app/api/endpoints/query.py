@@ -1,6 +1,9 @@
 from fastapi import APIRouter, status
+from fastapi.responses import StreamingResponse
 from app.schemas import query_schema
 from app.crud import query_crud
+from app.utils.executor import agent_executor
+from app.utils.sse import sse_stream
 
 router = APIRouter(
     prefix="/query",
@@ -9,7 +12,21 @@ router = APIRouter(
 
 @router.post("/", response_model=query_schema.QueryOutput, status_code=status.HTTP_201_CREATED)
 async def query(query: query_schema.QueryBase):
-    return query_crud.query(query)
+    return await agent_executor.run(query_crud.query, query)
+
+@router.post("/stream")
+async def query_stream(query: query_schema.QueryBase):
+    """
+    Server-Sent Events variant of the query endpoint. Emits `tool_call`,
+    `tool_result` and `token` events while the agent runs, then a final
+    `done` event with the same payload as the regular endpoint (or `error`).
+    """
+    events = agent_executor.stream(query_crud.query_stream, query)
+    return StreamingResponse(
+        sse_stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.post("/test")
 async def test_query():
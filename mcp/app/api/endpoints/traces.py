@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException, status
+from app.schemas import trace_schema
+from app.utils.tracing import tracing
+
+
+router = APIRouter(
+    prefix="/traces",
+    tags=["Request tracing"],
+)
+
+@router.get("/{trace_id}", response_model=trace_schema.TraceWaterfall, status_code=status.HTTP_200_OK)
+async def get_trace(trace_id: str):
+    """Waterfall of a recent request's spans, by the id from its X-Trace-Id response header."""
+    if not tracing.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tracing is disabled (set TRACING_ENABLED=true)")
+    waterfall = tracing.waterfall(trace_id)
+    if waterfall is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trace not found or no longer buffered")
+    return trace_schema.TraceWaterfall(**waterfall)
@@ -1,5 +1,8 @@
-from fastapi import APIRouter, status
-from app.utils.vectorize import setup_vector_store
+from typing import List
+from fastapi import APIRouter, HTTPException, status
+from app.schemas import training_schema
+from app.utils.ingestion_jobs import ingestion_jobs
+from app.utils.knowledge_registry import knowledge_registry
 
 
 router = APIRouter(
@@ -7,46 +10,52 @@ router = APIRouter(
     tags=["Setting up vector databases"],
 )
 
-cardano_data_path = './data/cardano'
-civil_law_data_path = './data/civil_law'
-corporate_law_data_path = './data/corporate_law'
-property_law_data_path = './data/property_law'
-
-cardano_store_path = './db/cardano'
-civil_law_store_path = './db/civil_law'
-corporate_law_store_path = './db/corporate_law'
-property_law_store_path = './db/property_law'
-
-@router.get("/setup_cardano_vector_db", status_code=status.HTTP_200_OK)
+def start_ingestion(stores: List[str]) -> training_schema.IngestionJobStatus:
+    try:
+        job = ingestion_jobs.submit(stores)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return training_schema.IngestionJobStatus(**job.as_dict())
+
+@router.post("/jobs", response_model=training_schema.IngestionJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def create_ingestion_job(job: training_schema.IngestionJobCreate):
+    """Start a background ingestion job for the given vector stores."""
+    return start_ingestion(job.stores)
+
+@router.get("/jobs", response_model=List[training_schema.IngestionJobStatus], status_code=status.HTTP_200_OK)
+async def list_ingestion_jobs():
+    """List queued, running and recently finished ingestion jobs."""
+    return [training_schema.IngestionJobStatus(**job.as_dict()) for job in ingestion_jobs.list()]
+
+@router.get("/jobs/{job_id}", response_model=training_schema.IngestionJobStatus, status_code=status.HTTP_200_OK)
+async def get_ingestion_job(job_id: str):
+    """Report the status and progress of an ingestion job."""
+    job = ingestion_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ingestion job not found")
+    return training_schema.IngestionJobStatus(**job.as_dict())
+
+@router.get("/setup_cardano_vector_db", response_model=training_schema.IngestionJobStatus, status_code=status.HTTP_202_ACCEPTED)
 async def setup_cardano_vector_db():
     """Set up the Cardano vector database."""
-    setup_vector_store(cardano_data_path, cardano_store_path)
-    return {"message": "Cardano vector database setup complete."}
+    return start_ingestion(["cardano"])
 
-@router.get("/setup_civil_law_vector_db", status_code=status.HTTP_200_OK)
+@router.get("/setup_civil_law_vector_db", response_model=training_schema.IngestionJobStatus, status_code=status.HTTP_202_ACCEPTED)
 async def setup_civil_law_vector_db():
     """Set up the Civil Law vector database."""
-    setup_vector_store(civil_law_data_path, civil_law_store_path)
-    return {"message": "Civil Law vector database setup complete."}
+    return start_ingestion(["civil_law"])
 
-@router.get("/setup_corporate_law_vector_db", status_code=status.HTTP_200_OK)
+@router.get("/setup_corporate_law_vector_db", response_model=training_schema.IngestionJobStatus, status_code=status.HTTP_202_ACCEPTED)
 async def setup_corporate_law_vector_db():
     """Set up the Corporate Law vector database."""
-    setup_vector_store(corporate_law_data_path, corporate_law_store_path)
-    return {"message": "Corporate Law vector database setup complete."}
+    return start_ingestion(["corporate_law"])
 
-@router.get("/setup_property_law_vector_db", status_code=status.HTTP_200_OK)
+@router.get("/setup_property_law_vector_db", response_model=training_schema.IngestionJobStatus, status_code=status.HTTP_202_ACCEPTED)
 async def setup_property_law_vector_db():
     """Set up the Property Law vector database."""
-    setup_vector_store(property_law_data_path, property_law_store_path)
-    return {"message": "Property Law vector database setup complete."}
+    return start_ingestion(["property_law"])
 
-@router.get("/setup_all_vector_dbs", status_code=status.HTTP_200_OK)
+@router.get("/setup_all_vector_dbs", response_model=training_schema.IngestionJobStatus, status_code=status.HTTP_202_ACCEPTED)
 async def setup_all_vector_dbs():
     """Set up all vector databases."""
-    setup_vector_store(cardano_data_path, cardano_store_path)
-    setup_vector_store(civil_law_data_path, civil_law_store_path)
-    setup_vector_store(corporate_law_data_path, corporate_law_store_path)
-    setup_vector_store(property_law_data_path, property_law_store_path)
-    return {"message": "All vector databases setup complete."}
-
+    return start_ingestion(knowledge_registry.names())
@@ -0,0 +1,175 @@
+import json
+import random
+import time
+from contextlib import nullcontext
+from typing import Iterable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import (
+    API_SECRET_TOKEN,
+    AUTH_EXEMPT_PATHS,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_EXEMPT_PATHS,
+    RATE_LIMIT_TRUST_FORWARDED,
+    ACCESS_LOG_SAMPLE_RATE,
+    ACCESS_LOG_SLOW_MS,
+    TRACING_EXCLUDE_PATHS,
+)
+from app.utils.metrics import HTTP_REQUEST_SECONDS
+from app.utils.rate_limiter import RateLimiter, rate_limiter
+from app.utils.tracing import Tracing, tracing as default_tracing
+
+import logging
+logger = logging.getLogger("app.access")
+
+
+class GatewayMiddleware:
+    """Rate limiting, token check, timing and access logging in one pure-ASGI layer.
+
+    Unlike ``BaseHTTPMiddleware`` this does not run the endpoint in a
+    separate task or re-wrap the response body, so streaming responses pass
+    straight through and each request costs a few dictionary lookups. Headers
+    are added by rewriting the ``http.response.start`` message.
+
+    With tracing enabled, each admitted request gets a root span whose id
+    is returned in ``X-Trace-Id`` and written to its access log line.
+
+    Access log lines are JSON. Errors, rejected and slow requests are always
+    logged; other requests are sampled at ``sample_rate``. Every request's
+    latency is recorded in the ``/metrics`` histogram regardless of sampling.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: RateLimiter = rate_limiter,
+        secret_token: str = API_SECRET_TOKEN,
+        auth_exempt: Iterable[str] = AUTH_EXEMPT_PATHS,
+        rate_limit_exempt: Iterable[str] = RATE_LIMIT_EXEMPT_PATHS,
+        sample_rate: float = ACCESS_LOG_SAMPLE_RATE,
+        slow_ms: float = ACCESS_LOG_SLOW_MS,
+        tracing: Tracing = default_tracing,
+        trace_exclude: Iterable[str] = TRACING_EXCLUDE_PATHS,
+    ):
+        self.app = app
+        self.limiter = limiter if RATE_LIMIT_ENABLED else None
+        self.secret_token = secret_token.encode("latin-1")
+        self.auth_exempt = frozenset(auth_exempt)
+        self.rate_limit_exempt = frozenset(rate_limit_exempt)
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.tracing = tracing if tracing.enabled else None
+        self.trace_exclude = tuple(trace_exclude)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        path = scope["path"]
+        token = forwarded = traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"secret-token":
+                token = value
+            elif name == b"x-forwarded-for":
+                forwarded = value
+            elif name == b"traceparent":
+                traceparent = value
+        client = self.client_id(scope, forwarded)
+
+        limited = self.limiter is not None and path not in self.rate_limit_exempt
+        decision = None
+        if limited:
+            decision = self.limiter.check(client, path)
+            if decision is not None and not decision.allowed:
+                await self.reject(send, 429, b"Rate limit exceeded", decision.headers())
+                self.log(scope, client, 429, started, "rate_limited")
+                return
+
+        authenticated = token == self.secret_token
+        if path not in self.auth_exempt and not authenticated:
+            await self.reject(send, 401, b"Invalid or missing security token", decision.headers() if decision else {})
+            self.log(scope, client, 401, started, "unauthorized")
+            return
+
+        # Token quota only after the token is validated, so unknown tokens cannot add limiter keys
+        if limited and authenticated:
+            token_decision = self.limiter.check_token(token.decode("latin-1"))
+            if token_decision is not None:
+                if not token_decision.allowed:
+                    await self.reject(send, 429, b"Rate limit exceeded", token_decision.headers())
+                    self.log(scope, client, 429, started, "rate_limited")
+                    return
+                if decision is None or token_decision.remaining < decision.remaining:
+                    decision = token_decision
+
+        status = 500
+        # Root span of the request; agent, tool and backend spans opened while handling it nest under it
+        span = None
+        if self.tracing and not path.startswith(self.trace_exclude):
+            span = self.tracing.start_request_span(scope["method"], path, traceparent)
+        trace_id = Tracing.trace_id(span)
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-process-time", f"{time.perf_counter() - started:.4f} seconds".encode("latin-1")))
+                if trace_id:
+                    headers.append((b"x-trace-id", trace_id.encode("latin-1")))
+                if decision is not None:
+                    headers.extend((name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in decision.headers().items())
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            with self.tracing.activate(span) if span is not None else nullcontext():
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            # Logged once the body is complete, so streamed responses report their full duration
+            if span is not None:
+                self.tracing.end_request_span(span, getattr(scope.get("route"), "path", None), status)
+            self.log(scope, client, status, started, trace_id=trace_id)
+
+    @staticmethod
+    def client_id(scope: Scope, forwarded: Optional[bytes]) -> str:
+        if forwarded and RATE_LIMIT_TRUST_FORWARDED:
+            return forwarded.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    async def reject(send: Send, status: int, body: bytes, headers: dict):
+        raw_headers = [
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ]
+        raw_headers.extend((name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items())
+        await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": body})
+
+    def log(self, scope: Scope, client: str, status: int, started: float, outcome: str = None, trace_id: str = None):
+        elapsed = time.perf_counter() - started
+        # Route templates (/threads/{thread_id}) keep the label set bounded; paths never reach the router on rejection
+        route = scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(elapsed, method=scope["method"], route=getattr(route, "path", "unmatched"), status=status)
+
+        duration_ms = elapsed * 1000
+        if status < 400 and duration_ms < self.slow_ms and random.random() >= self.sample_rate:
+            return
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status,
+            "client": client,
+            "duration_ms": round(duration_ms, 2),
+        }
+        if outcome:
+            record["outcome"] = outcome
+        if trace_id:
+            record["trace_id"] = trace_id
+        level = logging.WARNING if status >= 500 or duration_ms >= self.slow_ms else logging.INFO
+        logger.log(level, json.dumps(record))
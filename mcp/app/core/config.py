@@ -1,6 +1,5 @@
 import os
 from dotenv import load_dotenv
-from blockfrost import ApiUrls
 
 # Load environment variables from .env file
 load_dotenv()
@@ -10,7 +9,7 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
 # Blockfrost API Configuration
 BLOCKFROST_PROJECT_ID  = os.getenv("BLOCKFROST_PROJECT_ID")
-BLOCKFROST_BASE_URL = os.getenv("BLOCKFROST_BASE_URL", ApiUrls.preview.value)
+BLOCKFROST_BASE_URL = os.getenv("BLOCKFROST_BASE_URL", "https://cardano-preview.blockfrost.io/api")  # blockfrost.ApiUrls.preview
 
 # ChromaDB Configuration
 CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", "./chroma_data")
@@ -18,4 +17,113 @@ CHROMA_DB_PATH = os.getenv("CHROMA_DB_PATH", "./chroma_data")
 # LLM Configuration
 GEMINI_MODEL = "models/gemini-2.5-flash"  # Latest fast model
 GEMINI_EMBEDDING_MODEL = "models/embedding-001"  # Compatible with existing vector DBs
-TEMPERATURE = 0.1
\ No newline at end of file
+TEMPERATURE = 0.1
+
+# Agent Execution Configuration
+AGENT_MAX_WORKERS = int(os.getenv("AGENT_MAX_WORKERS", "8"))  # Concurrent agent runs per process
+AGENT_MAX_QUEUE = int(os.getenv("AGENT_MAX_QUEUE", "32"))  # Runs allowed to wait for a free worker
+
+# Ingestion Configuration
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))  # Chunks per embedding request
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))  # Embedding batches in flight at once
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "6"))  # Retries per batch when rate limited
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))  # PDF parser processes
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "8"))  # Items buffered between pipeline stages
+
+# Embedding Cache Configuration
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./db/embedding_cache.sqlite3")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))  # ~600 MB at 768 dims
+
+# Answer Cache Configuration (opt-in)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))  # Cosine similarity to reuse an answer
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))  # Per domain
+
+# Blockfrost Client Configuration
+BLOCKFROST_POOL_SIZE = int(os.getenv("BLOCKFROST_POOL_SIZE", "16"))  # Keep-alive connections
+BLOCKFROST_TIMEOUT = float(os.getenv("BLOCKFROST_TIMEOUT", "10"))  # Seconds per request
+BLOCKFROST_CACHE_MAX_ENTRIES = int(os.getenv("BLOCKFROST_CACHE_MAX_ENTRIES", "4096"))
+BLOCKFROST_IMMUTABLE_TTL = float(os.getenv("BLOCKFROST_IMMUTABLE_TTL", "86400"))  # Confirmed txs and UTxOs
+BLOCKFROST_ADDRESS_TTL = float(os.getenv("BLOCKFROST_ADDRESS_TTL", "20"))  # Balances and address history
+BLOCKFROST_MAX_CONCURRENCY = int(os.getenv("BLOCKFROST_MAX_CONCURRENCY", "8"))  # Parallel lookups per fan-out
+BLOCKFROST_HISTORY_COUNT = int(os.getenv("BLOCKFROST_HISTORY_COUNT", "5"))  # Transactions listed per address
+# Blockfrost allows 10 requests/s with a 500 request burst per project; split it across worker processes
+BLOCKFROST_RATE_LIMIT = float(os.getenv("BLOCKFROST_RATE_LIMIT", "10"))  # Requests per second
+BLOCKFROST_BURST = int(os.getenv("BLOCKFROST_BURST", "500"))
+BLOCKFROST_MAX_RETRIES = int(os.getenv("BLOCKFROST_MAX_RETRIES", "4"))  # Retries on 429/5xx and network errors
+BLOCKFROST_TRANSPORT = os.getenv("BLOCKFROST_TRANSPORT", "live")  # live, record or replay
+BLOCKFROST_FIXTURES_DIR = os.getenv("BLOCKFROST_FIXTURES_DIR", "./test/fixtures/blockfrost")
+
+# Conversation Checkpoint Configuration
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "sqlite")  # sqlite (shared file, survives restarts) or memory
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", "./db/checkpoints")  # One SQLite file per agent
+CHECKPOINT_THREAD_TTL_SECONDS = float(os.getenv("CHECKPOINT_THREAD_TTL_SECONDS", str(7 * 24 * 3600)))  # Idle threads expire
+CHECKPOINT_MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "10000"))  # Per agent; least recently used evicted first
+CHECKPOINT_MAX_MEMORY_MB = float(os.getenv("CHECKPOINT_MAX_MEMORY_MB", "256"))  # Memory backend ceiling per agent
+CHECKPOINT_KEEP_PER_THREAD = int(os.getenv("CHECKPOINT_KEEP_PER_THREAD", "3"))  # Both backends keep the latest N checkpoints per thread
+
+# Conversation Compaction Configuration
+COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "true").lower() == "true"
+COMPACTION_TOKEN_BUDGET = int(os.getenv("COMPACTION_TOKEN_BUDGET", "8000"))  # Estimated prompt tokens before older turns are summarized
+COMPACTION_KEEP_TURNS = int(os.getenv("COMPACTION_KEEP_TURNS", "3"))  # Most recent user turns always kept verbatim
+COMPACTION_TOOL_CHARS = int(os.getenv("COMPACTION_TOOL_CHARS", "400"))  # Tool output kept from earlier turns
+
+# Legal Domain Routing Configuration
+ROUTING_ENABLED = os.getenv("ROUTING_ENABLED", "true").lower() == "true"
+ROUTING_MIN_SIMILARITY = float(os.getenv("ROUTING_MIN_SIMILARITY", "0.55"))  # Classifier confidence needed to route
+ROUTING_MIN_MARGIN = float(os.getenv("ROUTING_MIN_MARGIN", "0.03"))  # Lead over the second-best domain
+
+# Cross-domain Legal Search Configuration
+LEGAL_FUSION_TOP_K = int(os.getenv("LEGAL_FUSION_TOP_K", "6"))  # Results returned by search_all_legal_knowledge
+LEGAL_FUSION_RRF_K = int(os.getenv("LEGAL_FUSION_RRF_K", "60"))  # Reciprocal-rank-fusion damping constant
+
+# Hybrid Retrieval Configuration
+HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))  # Results taken from each of BM25 and vector search before fusion
+HYBRID_LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "1.0"))  # BM25 weight in the fusion; vector search weighs 1.0
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))  # Reciprocal-rank-fusion damping constant
+LEXICAL_MMAP_MB = int(os.getenv("LEXICAL_MMAP_MB", "64"))  # Memory-mapped window of each store's lexical index
+
+# Legal Chunking Configuration
+LEGAL_CHUNK_TOKENS = int(os.getenv("LEGAL_CHUNK_TOKENS", "300"))  # Budget per chunk; longer sections are split at subsections
+LEGAL_CHUNK_MIN_TOKENS = int(os.getenv("LEGAL_CHUNK_MIN_TOKENS", "40"))  # Smaller fragments (bare headings) join the next chunk
+
+# Reranking Configuration
+RERANKER = os.getenv("RERANKER", "none")  # none, lexical (term overlap) or cross-encoder (needs sentence-transformers)
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")  # Small CPU cross-encoder
+RERANK_RETRIEVE_K = int(os.getenv("RERANK_RETRIEVE_K", "20"))  # Candidates retrieved before reranking
+RERANK_RETURN_K = int(os.getenv("RERANK_RETURN_K", "0"))  # Results kept after reranking; 0 uses each knowledge base's k
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))  # Question/chunk pairs per cross-encoder batch
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "4096"))  # Cached (question, chunk) scores
+
+# API Gateway Middleware Configuration
+API_SECRET_TOKEN = os.getenv("API_SECRET_TOKEN", "unihack25")  # Expected "Secret-token" request header
+AUTH_EXEMPT_PATHS = os.getenv("AUTH_EXEMPT_PATHS", "/docs,/redoc,/openapi.json").split(",")
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "0.1"))  # Share of successful requests logged
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "2000"))  # Slower requests are always logged
+
+# API Rate Limit Configuration (quotas are "requests/seconds"; the full quota may arrive as a burst)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "120/60")  # Per client, for routes without their own quota
+RATE_LIMIT_ROUTES = os.getenv("RATE_LIMIT_ROUTES", "/query=30/60,/legalquery=30/60,/training=10/60")  # Per client and route prefix
+RATE_LIMIT_TOKEN = os.getenv("RATE_LIMIT_TOKEN", "")  # Per API token across all clients, e.g. 600/60; off by default since the frontend shares one token
+RATE_LIMIT_EXEMPT_PATHS = os.getenv("RATE_LIMIT_EXEMPT_PATHS", "/docs,/redoc,/openapi.json,/health,/ready,/metrics").split(",")
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"  # Use X-Forwarded-For behind a proxy
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")  # memory (per process) or sqlite (shared by workers on one host)
+RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", "./db/rate_limits.sqlite3")
+RATE_LIMIT_SHARDS = int(os.getenv("RATE_LIMIT_SHARDS", "16"))  # Independently locked partitions of the memory store
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))  # Memory store cap; refilled keys are evicted first
+
+# Tracing Configuration (OpenTelemetry; requires opentelemetry-sdk)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file")  # file (JSON lines), console or none (in-memory waterfall only)
+TRACING_FILE_PATH = os.getenv("TRACING_FILE_PATH", "./logs/traces.jsonl")
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))  # Share of requests traced, unless the caller's traceparent decides
+TRACING_BUFFER_TRACES = int(os.getenv("TRACING_BUFFER_TRACES", "200"))  # Recent traces kept for GET /traces/{trace_id}
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "smart-lawyer-ai")
+TRACING_EXCLUDE_PATHS = tuple(filter(None, os.getenv("TRACING_EXCLUDE_PATHS", "/health,/ready,/metrics,/traces,/docs,/redoc,/openapi.json").split(",")))  # Path prefixes never traced
+
+# Startup Configuration
+STARTUP_MODE = os.getenv("STARTUP_MODE", "background")  # background, eager (warm up before serving) or lazy (on first request)
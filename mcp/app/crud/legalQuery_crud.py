@@ -1,8 +1,10 @@
 from fastapi import HTTPException, status
-from workflow.kickoff import run_legal_agent
 from app.schemas import legalQuery_schema
 
 def query(query: legalQuery_schema.LegalQueryBase):
+    # Imported on first use; see app.utils.warmup
+    from workflow.kickoff import run_legal_agent
+
     response = run_legal_agent(thread_id=query.thread_id, domain=query.domain, user_input=query.user_input)
     if response:
         return legalQuery_schema.LegalQueryOutput(
@@ -11,4 +13,19 @@ def query(query: legalQuery_schema.LegalQueryBase):
             lang=query.lang or "en"
         )
     else:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No answer found")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No answer found")
+
+def query_stream(query: legalQuery_schema.LegalQueryBase):
+    """Yield (event, data) progress events, ending with a "done" event carrying the LegalQueryOutput."""
+    from workflow.kickoff import stream_legal_agent
+
+    response = yield from stream_legal_agent(thread_id=query.thread_id, domain=query.domain, user_input=query.user_input)
+    if response:
+        output = legalQuery_schema.LegalQueryOutput(
+            answer=response,
+            thread_id=query.thread_id,
+            lang=query.lang or "en"
+        )
+        yield "done", output.model_dump(mode="json")
+    else:
+        yield "error", {"status_code": status.HTTP_404_NOT_FOUND, "detail": "No answer found"}
\ No newline at end of file
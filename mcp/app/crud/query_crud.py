@@ -1,8 +1,10 @@
 from fastapi import HTTPException, status
-from workflow.kickoff import run_cardano_agent
 from app.schemas import query_schema
 
 def query(query: query_schema.QueryBase):
+    # Imported on first use; see app.utils.warmup
+    from workflow.kickoff import run_cardano_agent
+
     response = run_cardano_agent(thread_id=query.thread_id, user_input=query.user_input)
     if response:
         return query_schema.QueryOutput(
@@ -11,4 +13,19 @@ def query(query: query_schema.QueryBase):
             lang=query.lang or "en"
         )
     else:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No answer found")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No answer found")
+
+def query_stream(query: query_schema.QueryBase):
+    """Yield (event, data) progress events, ending with a "done" event carrying the QueryOutput."""
+    from workflow.kickoff import stream_cardano_agent
+
+    response = yield from stream_cardano_agent(thread_id=query.thread_id, user_input=query.user_input)
+    if response:
+        output = query_schema.QueryOutput(
+            answer=response,
+            thread_id=query.thread_id,
+            lang=query.lang or "en"
+        )
+        yield "done", output.model_dump(mode="json")
+    else:
+        yield "error", {"status_code": status.HTTP_404_NOT_FOUND, "detail": "No answer found"}
\ No newline at end of file
@@ -0,0 +1,18 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+
+
+class TraceSpan(BaseModel):
+    name: str
+    span_id: str
+    parent_id: Optional[str] = None
+    depth: int
+    start_ms: float
+    duration_ms: float
+    status: str
+    attributes: Dict[str, Any] = {}
+
+class TraceWaterfall(BaseModel):
+    trace_id: str
+    duration_ms: float
+    spans: List[TraceSpan]
@@ -0,0 +1,23 @@
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel, ConfigDict
+
+
+class IngestionJobCreate(BaseModel):
+    stores: List[str]
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "stores": ["civil_law", "property_law"]
+            }
+        },
+    )
+
+class IngestionJobStatus(BaseModel):
+    job_id: str
+    status: str
+    stores: List[str]
+    current_store: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float
+    progress: Dict[str, Dict[str, Union[int, float]]] = {}
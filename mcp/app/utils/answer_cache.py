@@ -0,0 +1,127 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL_SECONDS,
+    ANSWER_CACHE_MAX_ENTRIES,
+)
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Questions about specific on-chain data must always hit the live network
+_LIVE_DATA_PATTERN = re.compile(r"\b(addr(_test)?1[0-9a-z]{20,}|stake(_test)?1[0-9a-z]{20,}|[0-9a-fA-F]{56,64})\b")
+
+
+class CachedAnswer:
+    def __init__(self, question: str, answer: str, vector: np.ndarray):
+        self.question = question
+        self.answer = answer
+        self.vector = vector
+        self.created_at = time.time()
+
+
+class SemanticAnswerCache:
+    """Reuses agent answers for near-identical first questions.
+
+    Entries are scoped by domain and matched on cosine similarity of the
+    question embedding. Only thread-independent questions are cached: the
+    first message of a new thread, which has no conversation history to
+    depend on, and which does not reference live on-chain data. Entries
+    expire after ``ttl`` seconds and each domain keeps at most
+    ``max_entries`` of them, evicting the least recently used.
+    """
+
+    def __init__(
+        self,
+        embeddings: Optional[Embeddings] = None,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl: float = ANSWER_CACHE_TTL_SECONDS,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+    ):
+        self._embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, "OrderedDict[int, CachedAnswer]"] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        if self._embeddings is None:
+            from app.utils.knowledge_registry import knowledge_registry
+
+            self._embeddings = knowledge_registry.embeddings
+        return self._embeddings
+
+    @staticmethod
+    def is_cacheable(question: str) -> bool:
+        return bool(question.strip()) and not _LIVE_DATA_PATTERN.search(question)
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(question.strip().lower()), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, domain: str, question: str) -> Optional[str]:
+        """Return a cached answer for a sufficiently similar question, if any."""
+        if not self.is_cacheable(question):
+            return None
+        vector = self._embed(question)
+        now = time.time()
+        with self._lock:
+            entries = self._entries.get(domain)
+            best_id, best_score = None, self.threshold
+            if entries:
+                for entry_id in [key for key, entry in entries.items() if now - entry.created_at > self.ttl]:
+                    del entries[entry_id]
+                if entries:
+                    ids = list(entries.keys())
+                    scores = np.stack([entries[key].vector for key in ids]) @ vector
+                    index = int(np.argmax(scores))
+                    if scores[index] >= best_score:
+                        best_id, best_score = ids[index], float(scores[index])
+            if best_id is None:
+                self.misses += 1
+                return None
+            entries.move_to_end(best_id)
+            self.hits += 1
+            entry = entries[best_id]
+        logger.info(f"Answer cache hit ({domain}, score={best_score:.3f}): {question!r} ~ {entry.question!r}")
+        return entry.answer
+
+    def store(self, domain: str, question: str, answer: str):
+        if not answer or not self.is_cacheable(question):
+            return
+        vector = self._embed(question)
+        with self._lock:
+            entries = self._entries.setdefault(domain, OrderedDict())
+            self._next_id += 1
+            entries[self._next_id] = CachedAnswer(question, answer, vector)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": ANSWER_CACHE_ENABLED,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": {domain: len(entries) for domain, entries in self._entries.items()},
+        }
+
+
+# Shared answer cache used by the agent kickoff functions
+answer_cache = SemanticAnswerCache()
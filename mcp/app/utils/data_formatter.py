@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 from datetime import datetime
 
 def format_transaction_data(tx_data: Dict[str, Any], utxo_data: Dict[str, Any]) -> str:
@@ -80,6 +80,19 @@ def format_utxo_data(utxo_data: Dict[str, Any]) -> str:
     
     return analysis
 
+def format_transaction_metadata(metadata: List[Dict[str, Any]]) -> str:
+    """Format transaction metadata labels"""
+    if not metadata:
+        return ""
+
+    formatted = "\n    **Metadata:**\n"
+    for entry in metadata:
+        value = str(entry.get('json_metadata', ''))
+        if len(value) > 200:
+            value = value[:200] + "..."
+        formatted += f"    - Label {entry.get('label', 'N/A')}: {value}\n"
+    return formatted
+
 def format_address_summary(address_data: Dict[str, Any]) -> str:
     """Format address information summary"""
     
@@ -0,0 +1,208 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import (
+    GEMINI_EMBEDDING_MODEL,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+)
+from app.utils.metrics import EMBEDDING_SECONDS, EMBEDDING_TEXTS
+from app.utils.tracing import tracing
+
+import logging
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+# Hits whose last_used refresh is held in memory before being written in one transaction
+_TOUCH_BATCH = 256
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """On-disk embedding cache keyed by ``(model, sha256(text))``.
+
+    Vectors are stored as float32 blobs in a WAL-mode SQLite database, so the
+    cache survives restarts and store rebuilds and can be shared by several
+    worker processes. Hits record the entry's ``last_used`` time in memory and
+    are written in batches (with the next insert, every few hundred hits and
+    before an eviction), so lookups rarely write. The least recently used
+    entries are evicted once ``max_entries`` is exceeded.
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        # (model, text_hash) -> last hit time, not yet written to last_used
+        self._touched: Dict[tuple, float] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily so importing this module (e.g. in parser worker processes) stays cheap
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " text_hash TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (model, text_hash))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        """Return cached vectors for whichever of ``hashes`` are present."""
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(unique), _SQL_BATCH):
+                batch = unique[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                self._touched.update(((model, key), now) for key in found)
+                if len(self._touched) >= _TOUCH_BATCH:
+                    self._flush_touched(conn)
+                    conn.commit()
+            self.hits += sum(1 for key in hashes if key in found)
+            self.misses += sum(1 for key in hashes if key not in found)
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model, key, array("f", vector).tobytes(), now) for key, vector in vectors.items()],
+            )
+            self._flush_touched(conn)
+            conn.commit()
+            self._writes_since_evict += len(vectors)
+            # Counting rows on every write is wasteful; check every few hundred inserts
+            if self._writes_since_evict >= 256:
+                self._writes_since_evict = 0
+                self._evict(conn)
+
+    def _flush_touched(self, conn: sqlite3.Connection):
+        """Write pending hit times to ``last_used``; the caller commits."""
+        if not self._touched:
+            return
+        conn.executemany(
+            "UPDATE embeddings SET last_used = MAX(last_used, ?) WHERE model = ? AND text_hash = ?",
+            [(used, model, key) for (model, key), used in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def _evict(self, conn: sqlite3.Connection):
+        self._flush_touched(conn)
+        (count,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        # Trim a little below the ceiling so eviction doesn't run on every write
+        excess += self.max_entries // 10
+        conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        conn.commit()
+        self.evictions += excess
+        logger.info(f"Evicted {excess} least recently used embeddings from cache")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """``Embeddings`` wrapper that serves repeated texts from an ``EmbeddingCache``.
+
+    Document and query embeddings are cached under separate keys because the
+    Gemini embedding API embeds them with different task types.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: Optional["EmbeddingCache"] = None, model: str = GEMINI_EMBEDDING_MODEL):
+        self.embeddings = embeddings
+        self.cache = cache or embedding_cache
+        self.model = model
+
+    def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        EMBEDDING_TEXTS.inc(len(texts), kind="document")
+        with EMBEDDING_SECONDS.time(kind="document"), tracing.span("embedding documents", texts=len(texts)):
+            return self.embeddings.embed_documents(texts)
+
+    def _embed_query(self, text: str) -> List[float]:
+        EMBEDDING_TEXTS.inc(kind="query")
+        with EMBEDDING_SECONDS.time(kind="query"), tracing.span("embedding query"):
+            return self.embeddings.embed_query(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not EMBEDDING_CACHE_ENABLED:
+            return self._embed_documents(texts)
+
+        model = f"{self.model}:document"
+        hashes = [text_hash(text) for text in texts]
+        found = self.cache.get_many(model, hashes)
+
+        # Embed each missing text once, even if it appears several times in the batch
+        missing = {key: text for key, text in zip(hashes, texts) if key not in found}
+        if missing:
+            vectors = self._embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(model, computed)
+            found.update(computed)
+        return [found[key] for key in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        if not EMBEDDING_CACHE_ENABLED:
+            return self._embed_query(text)
+
+        model = f"{self.model}:query"
+        key = text_hash(text)
+        found = self.cache.get_many(model, [key])
+        if key in found:
+            return found[key]
+        vector = self._embed_query(text)
+        self.cache.put_many(model, {key: vector})
+        return vector
+
+
+# Shared cache behind every embedding client in the process
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,122 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from app.core.config import AGENT_MAX_WORKERS, AGENT_MAX_QUEUE
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class BoundedExecutor:
+    """Thread pool that runs blocking agent calls off the event loop.
+
+    At most ``max_workers`` calls run at once and at most ``max_queue`` more
+    may wait for a worker. Anything beyond that is rejected immediately with
+    ``ExecutorSaturatedError`` instead of piling up behind slow requests.
+    """
+
+    def __init__(self, max_workers: int = AGENT_MAX_WORKERS, max_queue: int = AGENT_MAX_QUEUE):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.capacity = max_workers + max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently running or waiting for a worker."""
+        return self._in_flight
+
+    def _acquire(self):
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise ExecutorSaturatedError(
+                    f"Agent executor saturated ({self._in_flight}/{self.capacity} in flight)"
+                )
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` on the pool and await its result.
+
+        ``fn`` runs in a copy of the caller's context, so context variables
+        such as the request's trace span carry over to the worker thread.
+        """
+        self._acquire()
+        try:
+            future = self._pool.submit(contextvars.copy_context().run, partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # Release on completion rather than when the caller stops waiting, so a
+        # disconnected client does not free a slot its call is still holding.
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def stream(self, fn: Callable[..., Iterator[Any]], *args, **kwargs) -> AsyncIterator[Any]:
+        """Run generator function ``fn`` on the pool and return an async iterator over its items.
+
+        Capacity is reserved and the work submitted immediately, so
+        ``ExecutorSaturatedError`` is raised here, before a response starts.
+        Items are handed to the event loop as they are produced.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def emit(done: bool, item: Any):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, (done, item))
+            except RuntimeError:
+                # The event loop is gone; nobody is listening any more
+                cancelled.set()
+
+        def produce():
+            try:
+                for item in fn(*args, **kwargs):
+                    if cancelled.is_set():
+                        break
+                    emit(False, item)
+            except BaseException as e:
+                emit(True, e)
+            else:
+                emit(True, None)
+
+        self._acquire()
+        try:
+            future = self._pool.submit(contextvars.copy_context().run, produce)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+
+        async def consume():
+            try:
+                while True:
+                    done, item = await queue.get()
+                    if done:
+                        if item is not None:
+                            raise item
+                        return
+                    yield item
+            finally:
+                # Stop the producer at its next item if the client went away
+                cancelled.set()
+
+        return consume()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared executor for all agent endpoints
+agent_executor = BoundedExecutor()
@@ -0,0 +1,110 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from app.utils.knowledge_registry import knowledge_registry
+
+if TYPE_CHECKING:
+    from app.utils.vectorize import IngestionStats
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Finished jobs kept around for status queries
+MAX_FINISHED_JOBS = 50
+
+
+class IngestionJob:
+    """A request to (re)build one or more vector stores."""
+
+    def __init__(self, stores: List[str]):
+        self.id = uuid.uuid4().hex
+        self.stores = stores
+        self.status = "queued"
+        self.current_store: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.stats: Dict[str, "IngestionStats"] = {}
+
+    def as_dict(self) -> dict:
+        progress = {name: stats.as_dict() for name, stats in self.stats.items()}
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stores": self.stores,
+            "current_store": self.current_store,
+            "error": self.error,
+            "created_at": self.created_at,
+            "progress": progress,
+        }
+
+
+class IngestionJobManager:
+    """Runs ingestion jobs one at a time on a background worker thread.
+
+    Jobs run serially so a re-index never competes with itself for the
+    embedding quota, and never on the event loop so chat traffic keeps
+    flowing while a store is rebuilt.
+    """
+
+    def __init__(self):
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingestion")
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, stores: List[str]) -> IngestionJob:
+        """Queue a job for ``stores``, or return the queued or running job for the same stores."""
+        unknown = [name for name in stores if name not in knowledge_registry.names()]
+        if unknown:
+            raise ValueError(f"Unknown vector store(s): {', '.join(unknown)}")
+
+        with self._lock:
+            for existing in self._jobs.values():
+                if existing.status in ("queued", "running") and set(existing.stores) == set(stores):
+                    return existing
+            job = IngestionJob(stores)
+            self._jobs[job.id] = job
+            self._prune()
+        self._worker.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[IngestionJob]:
+        return list(self._jobs.values())
+
+    def shutdown(self):
+        """Stop taking jobs; queued jobs are cancelled and a running one finishes in the background."""
+        self._worker.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: IngestionJob):
+        job.status = "running"
+        try:
+            # Imported here so that loading the API does not pull in the ingestion stack
+            from app.utils.vectorize import IngestionStats, setup_vector_store
+
+            for name in job.stores:
+                data_path, store_path = knowledge_registry.paths(name)
+                job.current_store = name
+                job.stats[name] = IngestionStats()
+                setup_vector_store(data_path, store_path, stats=job.stats[name], chunker=knowledge_registry.chunker(name))
+            job.status = "completed"
+        except Exception as e:
+            logger.error(f"Ingestion job {job.id} failed: {e}", exc_info=True)
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.current_store = None
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("completed", "failed")]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+# Shared job manager for the training router
+ingestion_jobs = IngestionJobManager()
@@ -0,0 +1,189 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+# langchain and chromadb are slow to import; they are loaded on first use so the API starts fast
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+    from langchain_core.documents import Document
+    from langchain_core.embeddings import Embeddings
+    from app.utils.lexical_index import LexicalIndex
+
+from app.utils.metrics import RETRIEVAL_SECONDS
+from app.utils.tracing import tracing
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Every knowledge base the service knows about: raw documents, Chroma directory, results per search
+# and how documents are chunked (see app.utils.vectorize.create_splitter)
+KNOWLEDGE_BASES = {
+    "cardano": {"data_path": "./data/cardano", "store_path": "./db/cardano", "k": 4, "chunker": "recursive"},
+    "civil_law": {"data_path": "./data/civil_law", "store_path": "./db/civil_law", "k": 3, "chunker": "legal"},
+    "corporate_law": {"data_path": "./data/corporate_law", "store_path": "./db/corporate_law", "k": 3, "chunker": "legal"},
+    "property_law": {"data_path": "./data/property_law", "store_path": "./db/property_law", "k": 3, "chunker": "legal"},
+}
+
+
+class KnowledgeBaseClient:
+    """Search access to one registered knowledge base; the store opens on first search."""
+
+    def __init__(self, registry: "KnowledgeBaseRegistry", name: str):
+        self.registry = registry
+        self.name = name
+
+    @property
+    def vector_store(self) -> "Chroma":
+        return self.registry.store(self.name)
+
+    def search_knowledge_base(self, query: str) -> List["Document"]:
+        """Search the knowledge base for relevant documents"""
+        try:
+            return self.registry.search(self.name, query)
+        except Exception as e:
+            from langchain_core.documents import Document
+
+            return [Document(page_content=f"Error searching knowledge base: {str(e)}")]
+
+
+class KnowledgeBaseRegistry:
+    """Process-wide owner of the embedding client and the open Chroma stores.
+
+    Stores are opened lazily, once per directory, and reused by the search
+    tools, the ingestion pipeline and the training endpoints, all of which
+    share one embedding client (and with it the on-disk embedding cache).
+    Each store has a BM25 index beside it; searches fuse both rankings so
+    exact citations and defined terms are found as well as paraphrases.
+    """
+
+    def __init__(self, knowledge_bases: Dict[str, dict] = KNOWLEDGE_BASES):
+        self.knowledge_bases = knowledge_bases
+        self._embeddings = None
+        self._stores: Dict[str, "Chroma"] = {}
+        self._lexical: Dict[str, "LexicalIndex"] = {}
+        self._clients: Dict[str, KnowledgeBaseClient] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def embeddings(self) -> "Embeddings":
+        if self._embeddings is None:
+            with self._lock:
+                if self._embeddings is None:
+                    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+                    from app.core.config import GOOGLE_API_KEY, GEMINI_EMBEDDING_MODEL
+                    from app.utils.embedding_cache import CachedEmbeddings
+
+                    self._embeddings = CachedEmbeddings(GoogleGenerativeAIEmbeddings(
+                        model=GEMINI_EMBEDDING_MODEL,
+                        google_api_key=GOOGLE_API_KEY
+                    ))
+        return self._embeddings
+
+    def names(self) -> List[str]:
+        return list(self.knowledge_bases)
+
+    def paths(self, name: str) -> Tuple[str, str]:
+        """(data_path, store_path) of a knowledge base."""
+        kb = self.knowledge_bases[name]
+        return kb["data_path"], kb["store_path"]
+
+    def chunker(self, name: str) -> str:
+        return self.knowledge_bases[name].get("chunker", "recursive")
+
+    def open(self, store_path: str) -> "Chroma":
+        """The shared Chroma store for a directory, opened on first use."""
+        key = os.path.normpath(store_path)
+        store = self._stores.get(key)
+        if store is None:
+            from langchain_chroma import Chroma
+
+            embeddings = self.embeddings
+            with self._lock:
+                store = self._stores.get(key)
+                if store is None:
+                    logger.info(f"Opening vector store {store_path}")
+                    store = Chroma(persist_directory=store_path, embedding_function=embeddings)
+                    self._stores[key] = store
+        return store
+
+    def lexical(self, store_path: str) -> "LexicalIndex":
+        """The BM25 index kept beside a store's Chroma files."""
+        key = os.path.normpath(store_path)
+        with self._lock:
+            index = self._lexical.get(key)
+            if index is None:
+                from app.utils.lexical_index import LexicalIndex
+
+                index = self._lexical[key] = LexicalIndex(store_path)
+        return index
+
+    def store(self, name: str) -> "Chroma":
+        return self.open(self.knowledge_bases[name]["store_path"])
+
+    def close(self, store_path: str):
+        """Forget an open store, e.g. before its directory is deleted."""
+        key = os.path.normpath(store_path)
+        with self._lock:
+            self._stores.pop(key, None)
+            index = self._lexical.pop(key, None)
+        if index is not None:
+            index.close()
+
+    def search_path(self, store_path: str, query: str, k: int = 4) -> List["Document"]:
+        """Top ``k`` chunks of a store.
+
+        With a reranker configured, ``RERANK_RETRIEVE_K`` candidates are
+        retrieved and the best ``RERANK_RETURN_K`` (or ``k``) after reranking
+        are returned.
+        """
+        from app.core.config import RERANK_RETRIEVE_K, RERANK_RETURN_K
+        from app.utils.reranker import reranker
+
+        if not reranker.enabled:
+            return self.retrieve(store_path, query, k)
+        candidates = self.retrieve(store_path, query, max(k, RERANK_RETRIEVE_K))
+        store = os.path.basename(os.path.normpath(store_path))
+        with RETRIEVAL_SECONDS.time(store=store, stage="rerank"), tracing.span("retrieval rerank", store=store, candidates=len(candidates)):
+            return reranker.rerank(query, candidates, RERANK_RETURN_K or k)
+
+    def retrieve(self, store_path: str, query: str, k: int = 4) -> List["Document"]:
+        """Top ``k`` chunks of a store, fusing vector and BM25 rankings when hybrid search is on."""
+        from app.core.config import HYBRID_SEARCH_ENABLED, HYBRID_CANDIDATES, HYBRID_LEXICAL_WEIGHT, HYBRID_RRF_K
+
+        store = os.path.basename(os.path.normpath(store_path))
+        if not HYBRID_SEARCH_ENABLED:
+            with RETRIEVAL_SECONDS.time(store=store, stage="vector"), tracing.span("retrieval vector", store=store, k=k):
+                return self.open(store_path).similarity_search(query, k=k)
+
+        candidates = max(k, HYBRID_CANDIDATES)
+        # Includes embedding the query, which the embedding histograms break out separately
+        with RETRIEVAL_SECONDS.time(store=store, stage="vector"), tracing.span("retrieval vector", store=store, k=candidates):
+            ranked = {"vector": self.open(store_path).similarity_search(query, k=candidates)}
+        try:
+            with RETRIEVAL_SECONDS.time(store=store, stage="lexical"), tracing.span("retrieval lexical", store=store, k=candidates):
+                ranked["lexical"] = [doc for doc, _ in self.lexical(store_path).search(query, k=candidates)]
+        except Exception as e:
+            logger.warning(f"Lexical search failed for {store_path}, using vector results only: {e}")
+        if not ranked.get("lexical"):
+            return ranked["vector"][:k]
+
+        from app.utils.rank_fusion import reciprocal_rank_fusion
+
+        fused = reciprocal_rank_fusion(ranked, k=HYBRID_RRF_K, weights={"lexical": HYBRID_LEXICAL_WEIGHT})
+        return [doc for doc, _, _ in fused[:k]]
+
+    def search(self, name: str, query: str, k: int = None) -> List["Document"]:
+        return self.search_path(self.knowledge_bases[name]["store_path"], query, k or self.knowledge_bases[name]["k"])
+
+    def client(self, name: str) -> KnowledgeBaseClient:
+        if name not in self.knowledge_bases:
+            raise ValueError(f"Unknown knowledge base: {name}")
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                client = self._clients[name] = KnowledgeBaseClient(self, name)
+        return client
+
+
+# Shared registry; nothing is opened until the first search or ingestion
+knowledge_registry = KnowledgeBaseRegistry()
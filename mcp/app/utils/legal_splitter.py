@@ -0,0 +1,207 @@
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.core.config import LEGAL_CHUNK_TOKENS, LEGAL_CHUNK_MIN_TOKENS
+
+# Rough size of a token in English statute text; used to turn token budgets into characters
+CHARS_PER_TOKEN = 4
+
+# "413. (1) No company ...", "3B. (1) Every notary ...", "1.This Ordinance ..." - a number alone
+# on a line is a margin note or page number, so the heading must be followed by text.
+SECTION_RE = re.compile(r"^\s*(\d{1,3}[A-Z]{0,2})\s*\.\s*(?=[A-Z(“\"'‘])")
+SUBSECTION_RE = re.compile(r"^\s*\(\s*(\d{1,3}[A-Z]?)\s*\)\s*")
+SCHEDULE_RE = re.compile(r"^\s*((?:FIRST|SECOND|THIRD|FOURTH|FIFTH|SIXTH)\s+)?SCHEDULE(?:\s+([IVXLC]+|\d+))?\b")
+PART_RE = re.compile(r"^\s*PART\s+([IVXLC]+[A-Z]?)\b")
+# "Companies Act, No. 17 of 1982", "Civil Procedure Code (Amendment) Act, No. 43 of 2024"
+_ACT_NAME = r"((?:\(?[A-Z][\w'’]*\)?\s+(?:(?:of|and|for|on|the)\s+)*){1,8}(?:Act|Ordinance|Code|Law))"
+ACT_RE = re.compile(_ACT_NAME + r"\s*,?\s*No\s*\.?\s*(\d{1,3})\s*of\s*(\d{4})")
+CITED_AS_RE = re.compile(r"cited as the\s+" + _ACT_NAME + r"(?:\s*,?\s*No\s*\.?\s*(\d{1,3})\s*of\s*(\d{4}))?")
+
+
+def _citation(name: str, number: Optional[str], year: Optional[str]) -> str:
+    name = " ".join(name.split())
+    return f"{name}, No. {number} of {year}" if number and year else name
+
+
+def act_name(pages: List[Document]) -> str:
+    """Name of the enactment a PDF contains, e.g. ``Companies Act, No. 17 of 1982``.
+
+    Taken from the short-title section ("may be cited as the ..."), else from
+    a citation repeated as a running header on most pages, else from the PDF
+    title or file name. Acts merely referred to in the text are ignored.
+    """
+    texts = [" ".join(page.page_content.split()) for page in pages]
+    cited = CITED_AS_RE.search(" ".join(texts[:5]))
+    if cited:
+        return _citation(*cited.groups())
+
+    per_page = Counter()
+    for text in texts:
+        per_page.update({_citation(*match) for match in ACT_RE.findall(text)})
+    if per_page:
+        citation, count = per_page.most_common(1)[0]
+        if count >= max(2, len(pages) // 2):
+            return citation
+
+    metadata = pages[0].metadata if pages else {}
+    title = (metadata.get("title") or "").strip()
+    if title and " " in title and ".pdf" not in title.lower():
+        return title
+    return os.path.splitext(os.path.basename(metadata.get("source", "")))[0] or "Unknown enactment"
+
+
+def legal_citation(metadata: dict) -> Optional[str]:
+    """Human-readable citation of a chunk produced by ``LegalDocumentSplitter``, e.g.
+    ``Companies Act, No. 17 of 1982, s. 413(1), p. 270``; None for other chunks."""
+    if "act_name" not in metadata:
+        return None
+    parts = [metadata["act_name"]]
+    if metadata.get("schedule"):
+        parts.append(metadata["schedule"])
+    elif metadata.get("section"):
+        subsection = f"({metadata['subsection']})" if metadata.get("subsection") else ""
+        parts.append(f"s. {metadata['section']}{subsection}")
+    elif metadata.get("part"):
+        parts.append(f"Part {metadata['part']}")
+    if "page_label" in metadata or "page" in metadata:
+        parts.append(f"p. {metadata.get('page_label') or int(metadata['page']) + 1}")
+    return ", ".join(parts)
+
+
+class _Unit:
+    """A run of lines under one structural heading."""
+
+    def __init__(self, page: dict, part: Optional[str], section: Optional[str] = None,
+                 subsection: Optional[str] = None, schedule: Optional[str] = None):
+        self.page = page
+        self.part = part
+        self.section = section
+        self.subsection = subsection
+        self.schedule = schedule
+        self.lines: List[str] = []
+        self.last_page = page
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines).strip()
+
+
+class LegalDocumentSplitter:
+    """Splits statutes along part, section, subsection and schedule boundaries.
+
+    Pages are read as one continuous text so a section that runs over a page
+    break stays in one chunk. Each chunk carries the act name, part, section
+    (and subsection when a section had to be divided), schedule and the page
+    it starts on. Sections within ``chunk_tokens`` are kept whole; longer ones
+    are divided at subsection boundaries and, failing that, by characters.
+    Fragments under ``min_tokens`` - typically bare headings - are folded
+    into the chunk that follows. Text without recognisable structure is
+    chunked by size like the default splitter.
+    """
+
+    version = "legal-v1"
+
+    def __init__(self, chunk_tokens: int = LEGAL_CHUNK_TOKENS, min_tokens: int = LEGAL_CHUNK_MIN_TOKENS):
+        self.chunk_tokens = chunk_tokens
+        self.min_tokens = min_tokens
+        self.chunk_chars = chunk_tokens * CHARS_PER_TOKEN
+        self.min_chars = min_tokens * CHARS_PER_TOKEN
+        self.fallback = RecursiveCharacterTextSplitter(chunk_size=self.chunk_chars, chunk_overlap=self.chunk_chars // 10)
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the chunking; stored in the manifest so a change triggers re-chunking."""
+        return f"{self.version}:{self.chunk_tokens}:{self.min_tokens}"
+
+    def split_documents(self, pages: List[Document]) -> List[Document]:
+        if not pages:
+            return []
+        act = act_name(pages)
+        units = self._units(pages)
+        chunks: List[Document] = []
+        carry, carry_unit = "", None
+        for unit in units:
+            text = f"{carry}\n{unit.text}".strip() if carry else unit.text
+            if not text:
+                continue
+            if len(text) < self.min_chars and unit is not units[-1]:
+                # A bare heading or stub; prepend it to the next unit instead of indexing it alone
+                if carry_unit is None or not (carry_unit.section or carry_unit.schedule):
+                    carry_unit = unit
+                carry = text
+                continue
+            # A short section carried forward is still cited by its own number; a bare part heading is not
+            cited = carry_unit if carry_unit is not None and (carry_unit.section or carry_unit.schedule) else unit
+            last_section = unit.section if unit.section != cited.section else None
+            chunks.extend(self._emit(act, cited, text, last_section))
+            carry, carry_unit = "", None
+        return chunks
+
+    def _units(self, pages: List[Document]) -> List[_Unit]:
+        """Walk the lines of every page, opening a new unit at each structural heading."""
+        part = None
+        current = _Unit(pages[0].metadata, part)
+        units = [current]
+        for page in pages:
+            for line in page.page_content.splitlines():
+                part_match = PART_RE.match(line)
+                schedule_match = SCHEDULE_RE.match(line)
+                section_match = SECTION_RE.match(line)
+                subsection_match = SUBSECTION_RE.match(line)
+                if part_match:
+                    part = part_match.group(1)
+                    current = _Unit(page.metadata, part)
+                elif schedule_match:
+                    current = _Unit(page.metadata, part, schedule=" ".join(schedule_match.group(0).split()).title())
+                elif section_match:
+                    current = _Unit(page.metadata, part, section=section_match.group(1))
+                elif subsection_match and (current.section or current.schedule):
+                    current = _Unit(page.metadata, part, section=current.section,
+                                    subsection=subsection_match.group(1), schedule=current.schedule)
+                if not current.lines and current is not units[-1]:
+                    units.append(current)
+                current.lines.append(line)
+                current.last_page = page.metadata
+        return self._merge_subsections(units)
+
+    def _merge_subsections(self, units: List[_Unit]) -> List[_Unit]:
+        """Rejoin the subsections of a section wherever they fit the budget together."""
+        merged: List[_Unit] = []
+        for unit in units:
+            previous = merged[-1] if merged else None
+            same_section = (
+                previous is not None
+                and unit.subsection is not None
+                and (previous.section, previous.schedule) == (unit.section, unit.schedule)
+            )
+            if same_section and len(previous.text) + len(unit.text) + 1 <= self.chunk_chars:
+                previous.lines.extend(unit.lines)
+                previous.last_page = unit.last_page
+                continue
+            merged.append(unit)
+        return merged
+
+    def _emit(self, act: str, unit: _Unit, text: str, last_section: Optional[str] = None) -> List[Document]:
+        metadata: Dict[str, object] = {
+            key: value for key, value in unit.page.items()
+            if key in ("source", "page", "page_label", "total_pages", "title")
+        }
+        metadata["act_name"] = act
+        if unit.last_page.get("page") != unit.page.get("page"):
+            metadata["page_end"] = unit.last_page.get("page")
+        for key in ("part", "section", "subsection", "schedule"):
+            value = getattr(unit, key)
+            if value:
+                metadata[key] = value
+        if last_section and unit.section:
+            # Short sections folded together are cited as a range, e.g. "s. 1-2"
+            metadata["section"] = f"{unit.section}-{last_section}"
+            metadata.pop("subsection", None)
+        if len(text) <= self.chunk_chars:
+            return [Document(page_content=text, metadata=metadata)]
+        return [Document(page_content=piece, metadata=dict(metadata)) for piece in self.fallback.split_text(text)]
@@ -0,0 +1,147 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from app.core.config import LEXICAL_MMAP_MB
+
+import logging
+logger = logging.getLogger(__name__)
+
+LEXICAL_INDEX_FILE = "lexical.sqlite3"
+
+# SQLite limits the number of bound parameters per statement
+_SQL_BATCH = 500
+# Longest query, in distinct terms, sent to the index
+_MAX_QUERY_TERMS = 32
+
+
+def match_expression(query: str) -> Optional[str]:
+    """FTS5 query matching any of the words in ``query``; BM25 ranks the rarer terms higher.
+
+    Every term is quoted so user text such as ``"Section 4(2) - Act No. 17"``
+    can never be parsed as FTS5 syntax.
+    """
+    terms = list(dict.fromkeys(re.findall(r"\w+", query.lower())))[:_MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class LexicalIndex:
+    """BM25 inverted index of a vector store's chunks, kept next to it on disk.
+
+    Chunks live in a plain table keyed by the same IDs as the Chroma
+    collection and an external-content FTS5 table indexes their text, so
+    the file holds each chunk once plus its posting lists. The database is
+    opened with ``mmap_size`` so index pages are read through the page cache
+    rather than copied into SQLite's own buffers, and it is updated chunk by
+    chunk alongside the vector store during ingestion.
+    """
+
+    def __init__(self, store_path: str, mmap_mb: int = LEXICAL_MMAP_MB):
+        self.path = os.path.join(store_path, LEXICAL_INDEX_FILE)
+        self.mmap_mb = mmap_mb
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return self._conn is not None or os.path.exists(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_mb * 1024 * 1024)}")
+            conn.executescript(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                " rowid INTEGER PRIMARY KEY,"
+                " id TEXT NOT NULL UNIQUE,"
+                " content TEXT NOT NULL,"
+                " metadata TEXT NOT NULL);"
+                "CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5("
+                " content, content='chunks', content_rowid='rowid',"
+                " tokenize='unicode61 remove_diacritics 2');"
+                # Keep the FTS index in step with the chunks table
+                "CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN"
+                " INSERT INTO chunks_fts(rowid, content) VALUES (new.rowid, new.content); END;"
+                "CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN"
+                " INSERT INTO chunks_fts(chunks_fts, rowid, content) VALUES ('delete', old.rowid, old.content); END;"
+            )
+            self._conn = conn
+        return self._conn
+
+    def upsert(self, ids: Sequence[str], texts: Sequence[str], metadatas: Sequence[dict]):
+        """Add or replace chunks by ID."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._delete(conn, ids)
+                conn.executemany(
+                    "INSERT INTO chunks (id, content, metadata) VALUES (?, ?, ?)",
+                    [(chunk_id, text, json.dumps(metadata)) for chunk_id, text, metadata in zip(ids, texts, metadatas)],
+                )
+
+    def delete(self, ids: Sequence[str]):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._delete(conn, ids)
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, ids: Sequence[str]):
+        ids = list(ids)
+        for start in range(0, len(ids), _SQL_BATCH):
+            batch = ids[start:start + _SQL_BATCH]
+            conn.execute(f"DELETE FROM chunks WHERE id IN ({','.join('?' * len(batch))})", batch)
+
+    def reset(self):
+        """Drop every chunk, e.g. when the vector store is rebuilt from scratch."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM chunks")
+                conn.execute("INSERT INTO chunks_fts(chunks_fts) VALUES ('rebuild')")
+
+    def optimize(self):
+        """Merge the index's b-trees into one; worth running after a large ingestion."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("INSERT INTO chunks_fts(chunks_fts) VALUES ('optimize')")
+
+    def count(self) -> int:
+        if not self.exists():
+            return 0
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        """Top ``k`` chunks by BM25, as (document, score) with higher scores better."""
+        expression = match_expression(query)
+        if expression is None or not self.exists():
+            return []
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT c.id, c.content, c.metadata, bm25(chunks_fts) AS rank"
+                " FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid"
+                " WHERE chunks_fts MATCH ? ORDER BY rank LIMIT ?",
+                (expression, k),
+            ).fetchall()
+        # FTS5's bm25() is negated so that ascending order puts the best match first
+        return [
+            (Document(id=chunk_id, page_content=content, metadata=json.loads(metadata)), -rank)
+            for chunk_id, content, metadata, rank in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
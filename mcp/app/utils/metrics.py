@@ -0,0 +1,232 @@
+import bisect
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Seconds; spans a cached Chroma lookup up to a slow multi-tool agent run
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# (metric name, type, help, [(labels, value)]) as produced by collectors at scrape time
+Sample = Tuple[Dict[str, str], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def inc(self, value: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram, rendered in the Prometheus text format."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames))
+        return entry[2] if entry else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide metrics, exposed at ``/metrics`` in the Prometheus text format.
+
+    Counters and histograms are updated as events happen. Values that other
+    components already track - cache hits, rate-limiter counts - are read by
+    collectors when the endpoint is scraped instead of being duplicated.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def collector(self, fn: Callable[[], Iterable[Family]]):
+        """Register a function returning metric families to read at scrape time."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            for name, kind, help, samples in collect():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry behind the /metrics endpoint
+metrics = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "API request latency by route template and status.", ["method", "route", "status"]
+)
+GRAPH_NODE_SECONDS = metrics.histogram(
+    "agent_node_duration_seconds", "LangGraph node run time (compact, route, agent, tools).", ["agent", "node"]
+)
+TOOL_SECONDS = metrics.histogram("agent_tool_duration_seconds", "Tool call latency.", ["tool"])
+TOOL_ERRORS = metrics.counter("agent_tool_errors_total", "Tool calls that raised.", ["tool"])
+LLM_SECONDS = metrics.histogram("llm_request_duration_seconds", "Chat model call latency.", ["model"])
+LLM_TOKENS = metrics.counter("llm_tokens_total", "Chat model tokens by direction (input or output).", ["model", "direction"])
+RETRIEVAL_SECONDS = metrics.histogram(
+    "retrieval_duration_seconds", "Knowledge base search latency by stage (vector, lexical, rerank).", ["store", "stage"]
+)
+EMBEDDING_SECONDS = metrics.histogram("embedding_request_duration_seconds", "Embedding API call latency.", ["kind"])
+EMBEDDING_TEXTS = metrics.counter("embedding_texts_total", "Texts sent to the embedding API, i.e. embedding cache misses.", ["kind"])
+
+
+@metrics.collector
+def _cache_metrics() -> Iterable[Family]:
+    """Hit and miss counts of every cache, read from the caches themselves.
+
+    Only modules that are already loaded are inspected, so scraping never
+    pulls in the agent stack.
+    """
+    caches: Dict[str, dict] = {}
+    if "app.utils.embedding_cache" in sys.modules:
+        caches["embedding"] = sys.modules["app.utils.embedding_cache"].embedding_cache.stats()
+    if "app.utils.answer_cache" in sys.modules:
+        caches["answer"] = sys.modules["app.utils.answer_cache"].answer_cache.stats()
+    if "app.utils.reranker" in sys.modules:
+        caches["rerank_score"] = sys.modules["app.utils.reranker"].reranker.stats()
+    if "workflow.tools.blockfrost_tool" in sys.modules:
+        caches["blockfrost"] = sys.modules["workflow.tools.blockfrost_tool"].blockfrost_client.cache.stats()
+
+    yield "cache_hits_total", "counter", "Cache hits.", [({"cache": name}, stats["hits"]) for name, stats in caches.items()]
+    yield "cache_misses_total", "counter", "Cache misses.", [({"cache": name}, stats["misses"]) for name, stats in caches.items()]
+    yield "cache_hit_ratio", "gauge", "Cache hits over lookups since start.", [
+        ({"cache": name}, stats["hit_rate"]) for name, stats in caches.items()
+    ]
+
+
+@metrics.collector
+def _rate_limit_metrics() -> Iterable[Family]:
+    if "app.utils.rate_limiter" not in sys.modules:
+        return
+    stats = sys.modules["app.utils.rate_limiter"].rate_limiter.stats()
+    yield "rate_limit_decisions_total", "counter", "API rate limiter decisions (client and token quotas), admitted or rejected.", [
+        ({"outcome": "allowed"}, stats["allowed"]),
+        ({"outcome": "limited"}, stats["limited"]),
+    ]
+
+
+@metrics.collector
+def _blockfrost_metrics() -> Iterable[Family]:
+    """Client-side Blockfrost throttling and retries, by request priority."""
+    if "workflow.tools.blockfrost_tool" not in sys.modules:
+        return
+    stats = sys.modules["workflow.tools.blockfrost_tool"].blockfrost_client.stats()
+    limiter = stats["rate_limiter"]
+    yield "blockfrost_requests_total", "counter", "Blockfrost requests that took a rate-limit token.", [
+        ({"priority": priority}, values["acquired"]) for priority, values in limiter.items()
+    ]
+    yield "blockfrost_throttled_total", "counter", "Blockfrost requests that waited for a rate-limit token.", [
+        ({"priority": priority}, values["throttled"]) for priority, values in limiter.items()
+    ]
+    yield "blockfrost_throttle_wait_seconds_total", "counter", "Time spent waiting for Blockfrost rate-limit tokens.", [
+        ({"priority": priority}, values["wait_seconds"]) for priority, values in limiter.items()
+    ]
+    yield "blockfrost_retries_total", "counter", "Blockfrost requests retried after a 429, 5xx or connection error.", [
+        ({}, stats["retries"]),
+    ]
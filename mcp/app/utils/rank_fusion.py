@@ -0,0 +1,34 @@
+import hashlib
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+
+def chunk_key(doc: "Document") -> str:
+    """Identity of a chunk across stores and retrievers: its ingestion hash, else its normalised text."""
+    chunk_hash = doc.metadata.get("chunk_hash")
+    if chunk_hash:
+        return chunk_hash
+    return hashlib.sha256(" ".join(doc.page_content.split()).lower().encode("utf-8")).hexdigest()
+
+
+def reciprocal_rank_fusion(
+    ranked: Dict[str, List["Document"]],
+    k: int = 60,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[Tuple["Document", float, List[str]]]:
+    """
+    Fuse several rankings: each chunk scores sum(weight / (k + rank)) over the
+    rankings that returned it, and chunks returned by several are merged.
+    Returns (document, score, sources) sorted by score.
+    """
+    fused: Dict[str, list] = {}
+    for source, docs in ranked.items():
+        weight = (weights or {}).get(source, 1.0)
+        for rank, doc in enumerate(docs, 1):
+            entry = fused.setdefault(chunk_key(doc), [doc, 0.0, []])
+            entry[1] += weight / (k + rank)
+            if source not in entry[2]:
+                entry[2].append(source)
+    return sorted((tuple(entry) for entry in fused.values()), key=lambda entry: entry[1], reverse=True)
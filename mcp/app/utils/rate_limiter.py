@@ -0,0 +1,285 @@
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.config import (
+    RATE_LIMIT_DEFAULT,
+    RATE_LIMIT_ROUTES,
+    RATE_LIMIT_TOKEN,
+    RATE_LIMIT_STORE,
+    RATE_LIMIT_DB_PATH,
+    RATE_LIMIT_SHARDS,
+    RATE_LIMIT_MAX_KEYS,
+)
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class Quota(NamedTuple):
+    """``limit`` requests per ``period`` seconds, which may all arrive as one burst."""
+
+    limit: int
+    period: float
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.limit
+
+    @classmethod
+    def parse(cls, spec: str) -> "Quota":
+        """Parse ``"20/60"`` (20 requests per 60 seconds)."""
+        limit, _, period = spec.strip().partition("/")
+        return cls(int(limit), float(period or 1))
+
+
+def parse_route_quotas(spec: str) -> List[Tuple[str, Quota]]:
+    """Parse ``"/query=20/60,/training=5/60"`` into (path prefix, quota), longest prefix first."""
+    routes = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        prefix, _, quota = item.partition("=")
+        routes.append((prefix.strip(), Quota.parse(quota)))
+    return sorted(routes, key=lambda route: len(route[0]), reverse=True)
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: float  # Seconds until the quota is fully replenished
+    retry_after: float  # Seconds until the next request would be allowed; 0 when allowed
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+def _gcra(tat: Optional[float], quota: Quota, now: float) -> Tuple[bool, float, Decision]:
+    """One step of the generic cell rate algorithm, a token bucket stored as a single timestamp.
+
+    ``tat`` is the theoretical arrival time: when the bucket would be full
+    again given the requests already admitted. A request is admitted if
+    that leaves at most ``period`` seconds of debt. Returns (allowed, new
+    tat, decision).
+    """
+    tat = max(tat or now, now)
+    new_tat = tat + quota.interval
+    if new_tat - now > quota.period:
+        retry_after = new_tat - now - quota.period
+        return False, tat, Decision(False, quota.limit, 0, tat - now, retry_after)
+    remaining = int((quota.period - (new_tat - now)) / quota.interval + 1e-9)
+    return True, new_tat, Decision(True, quota.limit, remaining, new_tat - now, 0.0)
+
+
+class MemoryStore:
+    """Per-process limiter state, split across independently locked shards.
+
+    Each key holds one float, so a shard lock is held for a dictionary
+    lookup and a store; requests for different clients rarely contend.
+    Keys whose bucket has refilled carry no information and are swept
+    out, and each shard is capped at ``max_keys / shards`` entries.
+    """
+
+    def __init__(self, shards: int = RATE_LIMIT_SHARDS, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.shards = [({}, threading.Lock()) for _ in range(max(1, shards))]
+        self.max_per_shard = max(1, max_keys // len(self.shards))
+        self._ops = 0
+
+    def _shard(self, key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % len(self.shards)
+
+    def acquire(self, requests: Sequence[Tuple[str, Quota]], now: float) -> List[Decision]:
+        """Admit a request against every (key, quota) or none of them."""
+        indexes = sorted({self._shard(key) for key, _ in requests})
+        locks = [self.shards[index][1] for index in indexes]
+        # Lock in shard order so concurrent multi-key requests cannot deadlock
+        for lock in locks:
+            lock.acquire()
+        try:
+            results = []
+            for key, quota in requests:
+                table = self.shards[self._shard(key)][0]
+                results.append((table, key) + _gcra(table.get(key), quota, now))
+            allowed = all(result[2] for result in results)
+            if allowed:
+                for table, key, _, new_tat, _ in results:
+                    table[key] = new_tat
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+        self._ops += 1
+        if self._ops % 1024 == 0:
+            self.sweep(now)
+        for index in indexes:
+            table, lock = self.shards[index]
+            if len(table) > self.max_per_shard:
+                with lock:
+                    self._evict(table, now)
+        return [result[4] for result in results]
+
+    def _evict(self, table: dict, now: float):
+        for key in [key for key, tat in table.items() if tat <= now]:
+            del table[key]
+        excess = len(table) - self.max_per_shard
+        if excess > 0:
+            # Still over the cap: drop the keys closest to a full bucket first, trimming
+            # a little below the cap so this does not run again on the next request
+            excess += self.max_per_shard // 10
+            for key, _ in sorted(table.items(), key=lambda item: item[1])[:excess]:
+                del table[key]
+
+    def sweep(self, now: float = None):
+        """Drop every key whose bucket has fully refilled."""
+        now = time.time() if now is None else now
+        for table, lock in self.shards:
+            with lock:
+                for key in [key for key, tat in table.items() if tat <= now]:
+                    del table[key]
+
+    def __len__(self) -> int:
+        return sum(len(table) for table, _ in self.shards)
+
+
+class SQLiteStore:
+    """Limiter state in a WAL-mode SQLite file, shared by every worker process on the host.
+
+    Each decision is one short ``BEGIN IMMEDIATE`` transaction, so limits
+    hold across uvicorn workers. Refilled keys are deleted periodically.
+    """
+
+    SWEEP_EVERY = 500
+
+    def __init__(self, path: str = RATE_LIMIT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._ops = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def acquire(self, requests: Sequence[Tuple[str, Quota]], now: float) -> List[Decision]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            results = []
+            for key, quota in requests:
+                row = conn.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+                results.append((key,) + _gcra(row[0] if row else None, quota, now))
+            if all(result[1] for result in results):
+                conn.executemany(
+                    "INSERT INTO rate_limits (key, tat) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                    [(key, new_tat) for key, _, new_tat, _ in results],
+                )
+            self._ops += 1
+            if self._ops % self.SWEEP_EVERY == 0:
+                conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [result[3] for result in results]
+
+    def sweep(self, now: float = None):
+        conn = self._connect()
+        conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (time.time() if now is None else now,))
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+
+class RateLimiter:
+    """Per-client, per-route and per-token request quotas.
+
+    Every request counts against its client's quota for the route (the
+    longest matching prefix in ``routes``, else ``default``; ``check``)
+    and, once authenticated and when a token quota is configured, against
+    its token's quota across all clients (``check_token``). The token
+    quota is off by default because the frontend shares one token among
+    all users.
+    If the shared store fails the request is let through rather than
+    turning an infrastructure problem into an outage.
+    """
+
+    def __init__(
+        self,
+        default: Quota = Quota.parse(RATE_LIMIT_DEFAULT),
+        routes: List[Tuple[str, Quota]] = None,
+        token: Optional[Quota] = Quota.parse(RATE_LIMIT_TOKEN) if RATE_LIMIT_TOKEN else None,
+        store=None,
+    ):
+        self.default = default
+        self.routes = parse_route_quotas(RATE_LIMIT_ROUTES) if routes is None else routes
+        self.token = token
+        if store is None:
+            store = SQLiteStore() if RATE_LIMIT_STORE == "sqlite" else MemoryStore()
+        self.store = store
+        self.allowed = 0
+        self.limited = 0
+
+    def route_quota(self, path: str) -> Tuple[str, Quota]:
+        for prefix, quota in self.routes:
+            if path.startswith(prefix):
+                return prefix, quota
+        return "*", self.default
+
+    def check(self, client: str, path: str) -> Optional[Decision]:
+        """Charge the client's quota for the route."""
+        route, quota = self.route_quota(path)
+        return self._acquire([(f"client:{client}:{route}", quota)])
+
+    def check_token(self, token: str) -> Optional[Decision]:
+        """Charge an API token's quota, or return None when there is none.
+
+        Only call this for authenticated requests, so that made-up tokens
+        cannot create keys or spend a real token's quota.
+        """
+        if not self.token:
+            return None
+        return self._acquire([(f"token:{hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]}", self.token)])
+
+    def _acquire(self, requests: List[Tuple[str, Quota]]) -> Optional[Decision]:
+        try:
+            decisions = self.store.acquire(requests, time.time())
+        except Exception as e:
+            logger.warning(f"Rate limit store unavailable, allowing request: {e}")
+            return None
+        decision = min(decisions, key=lambda d: (d.allowed, d.remaining))
+        if decision.allowed:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return decision
+
+    def stats(self) -> dict:
+        return {
+            "store": type(self.store).__name__,
+            "keys": len(self.store),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+# Shared limiter behind the API's rate-limit middleware
+rate_limiter = RateLimiter()
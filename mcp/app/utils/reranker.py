@@ -0,0 +1,158 @@
+import hashlib
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from app.core.config import (
+    RERANKER,
+    RERANKER_MODEL,
+    RERANK_BATCH_SIZE,
+    RERANK_CACHE_SIZE,
+)
+from app.utils.rank_fusion import chunk_key
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Words that say nothing about which chunk answers a question
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i in is it its may of on or shall "
+    "that the their there this to under was what when where which who why will with".split()
+)
+
+
+def terms(text: str) -> List[str]:
+    return [term for term in re.findall(r"\w+", text.lower()) if term not in STOPWORDS]
+
+
+def lexical_overlap_score(query: str, text: str) -> float:
+    """Share of the question's terms found in ``text``, in [0, 1.5].
+
+    Longer terms and numbers (section numbers, years) weigh more than short
+    words, and adjacent query terms found side by side - "Act No 17",
+    "power of attorney" - add up to a 0.5 bonus.
+    """
+    query_terms = list(dict.fromkeys(terms(query)))
+    if not query_terms:
+        return 0.0
+    doc_terms = terms(text)
+    vocabulary = set(doc_terms)
+
+    def weight(term: str) -> float:
+        return 2.0 if term.isdigit() else math.log(1 + len(term))
+
+    total = sum(weight(term) for term in query_terms)
+    coverage = sum(weight(term) for term in query_terms if term in vocabulary) / total
+
+    query_bigrams = set(zip(query_terms, query_terms[1:]))
+    if not query_bigrams:
+        return coverage
+    doc_bigrams = set(zip(doc_terms, doc_terms[1:]))
+    return coverage + 0.5 * len(query_bigrams & doc_bigrams) / len(query_bigrams)
+
+
+class Reranker:
+    """Rescores retrieved chunks against the question and keeps the best few.
+
+    ``backend`` is ``cross-encoder`` (a small local sentence-transformers
+    model, scored in batches of ``batch_size`` on CPU) or ``lexical`` (term
+    and phrase overlap, no extra dependencies). The cross-encoder is loaded on
+    first use; if sentence-transformers is not installed or the model cannot
+    be loaded the lexical scorer is used instead. Scores are cached per
+    (question, chunk) so agent retries and repeated questions skip scoring.
+    """
+
+    def __init__(
+        self,
+        backend: str = RERANKER,
+        model_name: str = RERANKER_MODEL,
+        batch_size: int = RERANK_BATCH_SIZE,
+        cache_size: int = RERANK_CACHE_SIZE,
+    ):
+        if backend not in ("none", "lexical", "cross-encoder"):
+            raise ValueError(f"Unknown RERANKER: {backend!r} (expected 'none', 'lexical' or 'cross-encoder')")
+        self.backend = backend
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._model = None
+        self._cache: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend != "none"
+
+    def _load_model(self):
+        with self._lock:
+            if self._model is None and self.backend == "cross-encoder":
+                try:
+                    from sentence_transformers import CrossEncoder
+
+                    self._model = CrossEncoder(self.model_name, device="cpu")
+                    logger.info(f"Loaded reranker model {self.model_name}")
+                except Exception as e:
+                    logger.warning(f"Cross-encoder reranker unavailable ({e}); using lexical reranking")
+                    self.backend = "lexical"
+        return self._model
+
+    def _score(self, query: str, texts: List[str]) -> List[float]:
+        model = self._load_model() if self.backend == "cross-encoder" else None
+        if model is None:
+            return [lexical_overlap_score(query, text) for text in texts]
+        return [float(score) for score in model.predict([(query, text) for text in texts], batch_size=self.batch_size)]
+
+    def scores(self, query: str, docs: List["Document"]) -> List[float]:
+        """Relevance of each document to ``query``; higher is better."""
+        query_key = hashlib.sha256(" ".join(query.lower().split()).encode("utf-8")).hexdigest()
+        keys = [(self.backend, query_key, chunk_key(doc)) for doc in docs]
+        scores: Dict[Tuple[str, str, str], float] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    scores[key] = self._cache[key]
+            self.hits += sum(1 for key in keys if key in scores)
+            self.misses += sum(1 for key in keys if key not in scores)
+
+        missing = {key: doc.page_content for key, doc in zip(keys, docs) if key not in scores}
+        if missing:
+            computed = dict(zip(missing, self._score(query, list(missing.values()))))
+            scores.update(computed)
+            with self._lock:
+                # The backend may have fallen back to lexical while scoring; cache under what actually ran
+                for (_, query_hash, doc_key), score in computed.items():
+                    self._cache[(self.backend, query_hash, doc_key)] = score
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return [scores[key] for key in keys]
+
+    def rerank(self, query: str, docs: List["Document"], k: int) -> List["Document"]:
+        """The ``k`` documents that score highest against ``query``, best first."""
+        if not self.enabled or len(docs) <= 1:
+            return docs[:k]
+        scores = self.scores(query, docs)
+        # Stable sort: ties keep their retrieval order
+        order = sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)
+        return [docs[i] for i in order[:k]]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "cached": len(self._cache),
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Shared reranker used by every knowledge base search
+reranker = Reranker()
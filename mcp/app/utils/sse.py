@@ -0,0 +1,20 @@
+import json
+from typing import Any, AsyncIterator, Tuple
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Events frame with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def sse_stream(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[str]:
+    """Turn (event, data) pairs into SSE frames, reporting a failure as a final error frame."""
+    try:
+        async for event, data in events:
+            yield format_sse(event, data)
+    except Exception:
+        logger.error("Streaming response failed", exc_info=True)
+        yield format_sse("error", {"status_code": 500, "detail": "Internal error while streaming"})
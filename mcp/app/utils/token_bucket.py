@@ -0,0 +1,91 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Request priorities; lower values are served first when tokens are scarce
+INTERACTIVE = 0
+BACKGROUND = 1
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Priority of outbound calls made by the current request or job
+request_priority: ContextVar[int] = ContextVar("request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def background_priority():
+    """Mark outbound calls made inside the block as background work."""
+    token = request_priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every caller of a rate-limited API.
+
+    Tokens refill at ``rate`` per second up to ``burst``. Interactive callers
+    always take precedence: while any interactive caller is waiting,
+    background callers do not get tokens even if one is available.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._cond = threading.Condition()
+        self.acquired = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.throttled = {INTERACTIVE: 0, BACKGROUND: 0}
+        self.wait_seconds = {INTERACTIVE: 0.0, BACKGROUND: 0.0}
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority: int = None) -> float:
+        """Block until a token is available and return how long the caller waited."""
+        priority = request_priority.get() if priority is None else priority
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    self._refill()
+                    blocked = priority == BACKGROUND and self._waiting[INTERACTIVE] > 0
+                    if self._tokens >= 1 and not blocked:
+                        self._tokens -= 1
+                        break
+                    wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 1 / self.rate
+                    self._cond.wait(timeout=max(wait, 0.001))
+            finally:
+                self._waiting[priority] -= 1
+                # Let background waiters re-check once the last interactive caller is done
+                self._cond.notify_all()
+
+            waited = time.monotonic() - started
+            self.acquired[priority] += 1
+            if waited > 0.001:
+                self.throttled[priority] += 1
+                self.wait_seconds[priority] += waited
+        return waited
+
+    def drain(self):
+        """Empty the bucket, e.g. after the server reports that the quota is exhausted."""
+        with self._cond:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "acquired": self.acquired[priority],
+                "throttled": self.throttled[priority],
+                "wait_seconds": round(self.wait_seconds[priority], 3),
+            }
+            for priority, name in PRIORITY_NAMES.items()
+        }
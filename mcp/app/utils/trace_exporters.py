@@ -0,0 +1,63 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Sequence
+
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+# Spans kept per trace; a runaway agent loop should not grow the buffer without bound
+MAX_SPANS_PER_TRACE = 1000
+
+
+class RecentTraces(SpanProcessor):
+    """Finished spans of the most recent ``max_traces`` traces, for the waterfall endpoint.
+
+    Traces are evicted oldest first, counted from their first finished span.
+    """
+
+    def __init__(self, max_traces: int):
+        self.max_traces = max(1, max_traces)
+        self._traces: "OrderedDict[int, List[ReadableSpan]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def on_end(self, span: ReadableSpan):
+        if not span.context.trace_flags.sampled:
+            return
+        trace_id = span.context.trace_id
+        with self._lock:
+            spans = self._traces.get(trace_id)
+            if spans is None:
+                spans = self._traces[trace_id] = []
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            if len(spans) < MAX_SPANS_PER_TRACE:
+                spans.append(span)
+
+    def get(self, trace_id: int) -> List[ReadableSpan]:
+        with self._lock:
+            return list(self._traces.get(trace_id, ()))
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends each span as one line of OpenTelemetry JSON to a local file."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        with self._lock:
+            if self._file.closed:
+                return SpanExportResult.FAILURE
+            self._file.write(lines)
+            self._file.flush()
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,251 @@
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+from uuid import UUID
+
+from app.core.config import (
+    TRACING_ENABLED,
+    TRACING_EXPORTER,
+    TRACING_FILE_PATH,
+    TRACING_SAMPLE_RATE,
+    TRACING_BUFFER_TRACES,
+    TRACING_SERVICE_NAME,
+)
+
+import logging
+logger = logging.getLogger(__name__)
+
+# (LangChain run id, span) of the innermost Tracing.span() block being executed
+_current_block: ContextVar[Optional[tuple]] = ContextVar("trace_block", default=None)
+
+
+class Tracing:
+    """Per-request OpenTelemetry traces: API request, agent run, graph nodes, tools and backend calls.
+
+    The gateway middleware opens a root span per request and returns its
+    id in the ``X-Trace-Id`` header. Agent work runs on the executor's
+    threads with a copy of the request context, so spans opened there are
+    children of the request. LangGraph nodes, tool calls and chat model
+    calls get spans from ``workflow.callbacks.TracingCallbackHandler``,
+    which registers them here by callback run id; ``span()`` called inside
+    a tool (Blockfrost requests, knowledge base searches) nests under the
+    tool's span that way.
+
+    Finished spans are exported to a JSON-lines file or the console and
+    the most recent traces are kept in memory for ``/traces/{trace_id}``.
+    A private tracer provider is used, so libraries that bring their own
+    OpenTelemetry setup (chromadb) are not affected. When disabled, the
+    SDK is never imported and every helper is a no-op.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = TRACING_ENABLED,
+        exporter: str = TRACING_EXPORTER,
+        path: str = TRACING_FILE_PATH,
+        sample_rate: float = TRACING_SAMPLE_RATE,
+        buffer_traces: int = TRACING_BUFFER_TRACES,
+    ):
+        self.enabled = False
+        self.tracer = None
+        self.provider = None
+        self.recent = None
+        self._run_spans: Dict[UUID, Any] = {}
+        self._lock = threading.Lock()
+        if enabled:
+            try:
+                self._setup(exporter, path, sample_rate, buffer_traces)
+                self.enabled = True
+            except ImportError as e:
+                logger.warning(f"opentelemetry-sdk is not installed, tracing disabled: {e}")
+
+    def _setup(self, exporter: str, path: str, sample_rate: float, buffer_traces: int):
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+        from app.utils.trace_exporters import JsonLinesSpanExporter, RecentTraces
+
+        self.provider = TracerProvider(
+            resource=Resource.create({"service.name": TRACING_SERVICE_NAME}),
+            sampler=ParentBased(TraceIdRatioBased(sample_rate)),
+        )
+        self.recent = RecentTraces(buffer_traces)
+        self.provider.add_span_processor(self.recent)
+        if exporter == "file":
+            self.provider.add_span_processor(BatchSpanProcessor(JsonLinesSpanExporter(path)))
+        elif exporter == "console":
+            self.provider.add_span_processor(
+                BatchSpanProcessor(ConsoleSpanExporter(formatter=lambda span: span.to_json(indent=None) + "\n"))
+            )
+        self.tracer = self.provider.get_tracer("smart-lawyer-ai")
+
+    # Request spans, opened and closed by the gateway middleware
+    def start_request_span(self, method: str, path: str, traceparent: Optional[bytes] = None):
+        """Root span of an API request, joining the caller's trace when a W3C ``traceparent`` is sent."""
+        from opentelemetry.trace import SpanKind
+        from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+
+        context = None
+        if traceparent:
+            context = TraceContextTextMapPropagator().extract({"traceparent": traceparent.decode("latin-1")})
+        return self.tracer.start_span(
+            f"{method} {path}",
+            context=context,
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": method, "url.path": path},
+        )
+
+    @staticmethod
+    def end_request_span(span, route: Optional[str], status: int):
+        from opentelemetry.trace import Status, StatusCode
+
+        if route:
+            span.update_name(f"{span.attributes.get('http.request.method')} {route}")
+            span.set_attribute("http.route", route)
+        span.set_attribute("http.response.status_code", status)
+        if status >= 500:
+            span.set_status(Status(StatusCode.ERROR))
+        span.end()
+
+    @staticmethod
+    def activate(span):
+        """Make ``span`` the current span for the duration of a ``with`` block, without ending it."""
+        from opentelemetry.trace import use_span
+
+        return use_span(span, end_on_exit=False)
+
+    @staticmethod
+    def trace_id(span) -> Optional[str]:
+        """Hex trace id of a sampled span, as returned in the ``X-Trace-Id`` header."""
+        if span is None or not span.get_span_context().trace_flags.sampled:
+            return None
+        return format(span.get_span_context().trace_id, "032x")
+
+    # Spans inside a request
+    def start_span(self, name: str, parent=None, attributes: Dict[str, Any] = None):
+        """Start a span under ``parent`` (a span), else under the current span. Returns None when disabled."""
+        if not self.enabled:
+            return None
+        from opentelemetry.trace import set_span_in_context
+
+        context = set_span_in_context(parent) if parent is not None else None
+        return self.tracer.start_span(name, context=context, attributes=_attributes(attributes))
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Optional[Any]]:
+        """Trace a block of code; nested under the LangChain tool or node running it, if any.
+
+        Yields the span, or None when tracing is off or no trace is active.
+        Exceptions are recorded on the span and re-raised.
+        """
+        if not self.enabled:
+            yield None
+            return
+        from opentelemetry.trace import get_current_span, use_span
+
+        run_id = self._langchain_run_id()
+        block = _current_block.get()
+        # Directly inside another span() block of the same run: nest under that block, the current span
+        parent = None if block is not None and block[0] == run_id else self.run_span(run_id)
+        if parent is None and not get_current_span().get_span_context().is_valid:
+            # Not part of a request (e.g. a background ingestion job); do not start stray root traces
+            yield None
+            return
+        span = self.start_span(name, parent=parent, attributes=attributes)
+        token = _current_block.set((run_id, span))
+        try:
+            with use_span(span, end_on_exit=True, record_exception=True, set_status_on_exception=True):
+                yield span
+        finally:
+            _current_block.reset(token)
+
+    @staticmethod
+    def annotate(span, **attributes):
+        """Set attributes on a span returned by ``span()``; ignores None."""
+        if span is not None:
+            span.set_attributes(_attributes(attributes))
+
+    # LangChain callback runs, see workflow.callbacks.TracingCallbackHandler
+    def bind_run(self, run_id: UUID, span):
+        with self._lock:
+            self._run_spans[run_id] = span
+
+    def unbind_run(self, run_id: UUID):
+        with self._lock:
+            return self._run_spans.pop(run_id, None)
+
+    def run_span(self, run_id: Optional[UUID]):
+        return self._run_spans.get(run_id) if run_id is not None else None
+
+    @staticmethod
+    def _langchain_run_id() -> Optional[UUID]:
+        """Callback run id of the LangChain run (tool, node) whose code is executing, if any."""
+        config_module = sys.modules.get("langchain_core.runnables.config")
+        if config_module is None:
+            return None
+        config = config_module.var_child_runnable_config.get()
+        return getattr((config or {}).get("callbacks"), "parent_run_id", None)
+
+    # Waterfall view
+    def waterfall(self, trace_id: str) -> Optional[dict]:
+        """Spans of a recent trace in start order, with offsets from the trace start and nesting depth."""
+        if not self.enabled:
+            return None
+        try:
+            spans = self.recent.get(int(trace_id, 16))
+        except ValueError:
+            return None
+        if not spans:
+            return None
+
+        spans.sort(key=lambda span: span.start_time)
+        started = spans[0].start_time
+        ended = max(span.end_time for span in spans)
+        parents = {span.context.span_id: span.parent.span_id if span.parent else None for span in spans}
+
+        def depth(span_id: int) -> int:
+            level = 0
+            while parents.get(span_id) in parents:
+                span_id = parents[span_id]
+                level += 1
+            return level
+
+        return {
+            "trace_id": trace_id,
+            "duration_ms": round((ended - started) / 1e6, 3),
+            "spans": [
+                {
+                    "name": span.name,
+                    "span_id": format(span.context.span_id, "016x"),
+                    "parent_id": format(span.parent.span_id, "016x") if span.parent else None,
+                    "depth": depth(span.context.span_id),
+                    "start_ms": round((span.start_time - started) / 1e6, 3),
+                    "duration_ms": round((span.end_time - span.start_time) / 1e6, 3),
+                    "status": span.status.status_code.name,
+                    "attributes": dict(span.attributes or {}),
+                }
+                for span in spans
+            ],
+        }
+
+    def shutdown(self):
+        if self.provider is not None:
+            self.provider.shutdown()
+
+
+def _attributes(attributes: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Drop None values and stringify anything OpenTelemetry cannot store as an attribute."""
+    if not attributes:
+        return {}
+    return {
+        key: value if isinstance(value, (str, bool, int, float)) else str(value)
+        for key, value in attributes.items()
+        if value is not None
+    }
+
+
+# Shared tracer for the API process
+tracing = Tracing()
@@ -1,52 +1,443 @@
 from langchain_chroma import Chroma
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.document_loaders import DirectoryLoader, PyPDFLoader
+from langchain_community.document_loaders import PyPDFLoader
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from app.core.config import GOOGLE_API_KEY, GEMINI_EMBEDDING_MODEL
+from app.core.config import (
+    EMBED_BATCH_SIZE,
+    EMBED_CONCURRENCY,
+    EMBED_MAX_RETRIES,
+    PARSE_WORKERS,
+    INGEST_QUEUE_SIZE,
+)
+from app.utils.knowledge_registry import knowledge_registry
+from app.utils.lexical_index import LexicalIndex
+from app.utils.legal_splitter import LegalDocumentSplitter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+import multiprocessing
+import threading
+import random
+import queue
+import hashlib
+import glob
+import json
 import shutil
+import time
 import os
 
-embeddings = GoogleGenerativeAIEmbeddings(
-    model=GEMINI_EMBEDDING_MODEL,
-    google_api_key=GOOGLE_API_KEY
-)
+cardano_data_path, cardano_store_path = knowledge_registry.paths("cardano")
+civil_law_data_path, civil_law_store_path = knowledge_registry.paths("civil_law")
+corporate_law_data_path, corporate_law_store_path = knowledge_registry.paths("corporate_law")
+property_law_data_path, property_law_store_path = knowledge_registry.paths("property_law")
 
-cardano_data_path = './data/cardano'
-civil_law_data_path = './data/civil_law'
-corporate_law_data_path = './data/corporate_law'
-property_law_data_path = './data/property_law'
+# Vector stores that can be (re)built, keyed by the name used in the training API
+VECTOR_STORES = {name: knowledge_registry.paths(name) for name in knowledge_registry.names()}
 
-cardano_store_path = './db/cardano'
-civil_law_store_path = './db/civil_law'
-corporate_law_store_path = './db/corporate_law'
-property_law_store_path = './db/property_law'
 
-def setup_vector_store(data_path: str, store_path: str):
-    loader = DirectoryLoader(data_path, glob="*.pdf", show_progress=True, loader_cls=PyPDFLoader)
-    docs = loader.load()
+class IngestionStats:
+    """Thread-safe progress counters for a single ingestion run."""
 
-    print(f"Loaded {len(docs)} documents.")
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.files_total = 0
+        self.files_parsed = 0
+        self.files_skipped = 0
+        self.pages_parsed = 0
+        self.chunks_total = 0
+        self.chunks_embedded = 0
+        self.chunks_skipped = 0
+        self.chunks_deleted = 0
+        self.rate_limited = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
 
-    text_splitter = RecursiveCharacterTextSplitter()
-    split_docs = text_splitter.split_documents(docs)
+    def add(self, **counters: int):
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
 
-    # Create a Chroma vector store (persistent)
-    Chroma.from_documents(
-        documents=split_docs,
-        embedding=embeddings,
-        persist_directory=store_path,
-    )
+    def finish(self):
+        self.finished_at = time.time()
 
-    print("Chroma vector store setup complete.")
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
 
+    def as_dict(self) -> dict:
+        elapsed = max(self.elapsed, 1e-6)
+        return {
+            "files_total": self.files_total,
+            "files_parsed": self.files_parsed,
+            "files_skipped": self.files_skipped,
+            "pages_parsed": self.pages_parsed,
+            "chunks_total": self.chunks_total,
+            "chunks_embedded": self.chunks_embedded,
+            "chunks_skipped": self.chunks_skipped,
+            "chunks_deleted": self.chunks_deleted,
+            "rate_limited": self.rate_limited,
+            "elapsed_seconds": round(self.elapsed, 2),
+            "pages_per_second": round(self.pages_parsed / elapsed, 2),
+            "chunks_per_second": round(self.chunks_embedded / elapsed, 2),
+        }
 
-def search_vector_store(query: str, store_path: str):
-    vector_store = Chroma(
-        persist_directory=store_path,
-        embedding_function=embeddings
-    )
 
-    results = vector_store.similarity_search(query, k=4)
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Fingerprint of the default splitter; also assumed for manifests written before chunkers were recorded
+RECURSIVE_CHUNKER = "recursive-v1"
+
+
+def create_splitter(chunker: str = "recursive"):
+    """Splitter for a knowledge base's ``chunker`` setting and the fingerprint recorded in its manifest."""
+    if chunker == "legal":
+        splitter = LegalDocumentSplitter()
+        return splitter, splitter.fingerprint
+    if chunker == "recursive":
+        return RecursiveCharacterTextSplitter(), RECURSIVE_CHUNKER
+    raise ValueError(f"Unknown chunker: {chunker!r} (expected 'recursive' or 'legal')")
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file's bytes without loading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(store_path: str) -> Optional[dict]:
+    """Load the per-store manifest of file and chunk hashes, if there is one."""
+    path = os.path.join(store_path, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_manifest(store_path: str, manifest: dict):
+    """Write the manifest atomically so an interrupted run never leaves it half-written."""
+    os.makedirs(store_path, exist_ok=True)
+    path = os.path.join(store_path, MANIFEST_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def assign_chunk_ids(file_key: str, chunks: List[Document]) -> Dict[str, Document]:
+    """Give each chunk a stable ID derived from its file, page and content.
+
+    Unchanged chunks keep their ID across runs, so editing part of a PDF only
+    re-embeds the chunks whose text (or page) actually changed.
+    """
+    ids: Dict[str, Document] = {}
+    seen: Dict[str, int] = {}
+    for chunk in chunks:
+        chunk_hash = hashlib.sha256(chunk.page_content.encode("utf-8")).hexdigest()
+        key = f"{file_key}|{chunk.metadata.get('page', '')}|{chunk_hash}"
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        chunk_id = hashlib.sha256(f"{key}|{occurrence}".encode("utf-8")).hexdigest()[:32]
+        chunk.metadata["chunk_hash"] = chunk_hash
+        ids[chunk_id] = chunk
+    return ids
+
+
+def parse_pdf(path: str) -> List[Document]:
+    """Parse one PDF into per-page documents. Runs in a worker process."""
+    return PyPDFLoader(path).load()
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """Best-effort detection of quota / throttling errors from the embedding API."""
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in ("429", "resource_exhausted", "resourceexhausted", "quota", "rate limit"))
+
+
+class IngestionPipeline:
+    """Parse, chunk and embed changed PDFs as three concurrent stages.
+
+    PDFs are parsed in a process pool, chunked on a single thread and
+    embedded in ``EMBED_BATCH_SIZE`` batches by ``EMBED_CONCURRENCY`` threads.
+    Every batch written to the vector store is added to its BM25 index too.
+    Stages are connected by bounded queues so a fast parser cannot run
+    arbitrarily far ahead of a throttled embedding API. When any batch hits a
+    rate limit every embedding thread backs off together.
+    """
+
+    def __init__(self, vector_store: Chroma, lexical_index: LexicalIndex, manifest: dict, stats: IngestionStats, text_splitter=None):
+        self.vector_store = vector_store
+        self.lexical_index = lexical_index
+        self.files = manifest["files"]
+        self.stats = stats
+        self.text_splitter = text_splitter or RecursiveCharacterTextSplitter()
+        self.parsed_queue: "queue.Queue" = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+        self.batch_queue: "queue.Queue" = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+        self.write_lock = threading.Lock()
+        self.state_lock = threading.Lock()
+        self.pending_batches: Dict[str, int] = {}
+        self.pending_entries: Dict[str, dict] = {}
+        self.backoff_until = 0.0
+        self.failed = threading.Event()
+        self.errors: List[Exception] = []
+
+    def run(self, changed: Dict[str, tuple]):
+        """Index ``changed``, a mapping of file key to ``(path, sha256)``."""
+        chunker = threading.Thread(target=self._guard, args=(self._chunk_stage,), name="ingest-chunker")
+        embedders = [
+            threading.Thread(target=self._guard, args=(self._embed_stage,), name=f"ingest-embed-{i}")
+            for i in range(EMBED_CONCURRENCY)
+        ]
+        chunker.start()
+        for thread in embedders:
+            thread.start()
+
+        try:
+            self._parse_stage(changed)
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._put(self.parsed_queue, None)
+            chunker.join()
+            for _ in embedders:
+                self._put(self.batch_queue, None)
+            for thread in embedders:
+                thread.join()
+
+        if self.errors:
+            raise self.errors[0]
+
+    def _guard(self, stage):
+        try:
+            stage()
+        except Exception as e:
+            self._fail(e)
+
+    def _fail(self, error: Exception):
+        self.errors.append(error)
+        self.failed.set()
+
+    def _put(self, q: "queue.Queue", item):
+        """Blocking put that gives up once any stage has failed."""
+        while not self.failed.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: "queue.Queue"):
+        """Blocking get that returns the end-of-stream marker once any stage has failed."""
+        while not self.failed.is_set():
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return None
+
+    # Stage 1: parse PDFs, in a process pool when more than one file changed
+    def _parse_stage(self, changed: Dict[str, tuple]):
+        if PARSE_WORKERS <= 1 or len(changed) <= 1:
+            for file_key, (path, file_hash) in changed.items():
+                if self.failed.is_set():
+                    return
+                self._put(self.parsed_queue, (file_key, file_hash, parse_pdf(path)))
+            return
+
+        # Spawn rather than fork: the server process has live threads and DB handles
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(PARSE_WORKERS, len(changed)), mp_context=context) as pool:
+            futures = {pool.submit(parse_pdf, path): (file_key, file_hash) for file_key, (path, file_hash) in changed.items()}
+            for future in as_completed(futures):
+                if self.failed.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    return
+                file_key, file_hash = futures[future]
+                self._put(self.parsed_queue, (file_key, file_hash, future.result()))
+
+    # Stage 2: split pages into chunks, diff against the manifest and emit embedding batches
+    def _chunk_stage(self):
+        while True:
+            item = self._get(self.parsed_queue)
+            if item is None:
+                return
+            file_key, file_hash, pages = item
+            self.stats.add(files_parsed=1, pages_parsed=len(pages))
+
+            chunks = assign_chunk_ids(file_key, self.text_splitter.split_documents(pages))
+            previous = self.files.get(file_key)
+            old_chunks = previous["chunks"] if previous else {}
+            if previous and previous["sha256"] is None:
+                # Re-chunking: rewrite every chunk so its metadata comes from the new splitter
+                new_ids = list(chunks)
+            else:
+                new_ids = [chunk_id for chunk_id in chunks if chunk_id not in old_chunks]
+            stale_ids = [chunk_id for chunk_id in old_chunks if chunk_id not in chunks]
+            self.stats.add(chunks_total=len(new_ids), chunks_skipped=len(chunks) - len(new_ids))
+
+            if stale_ids:
+                with self.write_lock:
+                    self.vector_store.delete(ids=stale_ids)
+                    self.lexical_index.delete(stale_ids)
+                self.stats.add(chunks_deleted=len(stale_ids))
+
+            entry = {
+                "sha256": file_hash,
+                "chunks": {chunk_id: chunk.metadata["chunk_hash"] for chunk_id, chunk in chunks.items()},
+            }
+            batches = [new_ids[i:i + EMBED_BATCH_SIZE] for i in range(0, len(new_ids), EMBED_BATCH_SIZE)]
+            print(f"Chunked {file_key}: {len(new_ids)} new chunks in {len(batches)} batches, {len(stale_ids)} removed.")
+            if not batches:
+                self._complete_file(file_key, entry)
+                continue
+
+            with self.state_lock:
+                self.pending_batches[file_key] = len(batches)
+                self.pending_entries[file_key] = entry
+            for batch_ids in batches:
+                self._put(self.batch_queue, (file_key, [(chunk_id, chunks[chunk_id]) for chunk_id in batch_ids]))
+
+    # Stage 3: embed batches concurrently and write them to the store
+    def _embed_stage(self):
+        while True:
+            item = self._get(self.batch_queue)
+            if item is None:
+                return
+            file_key, batch = item
+            ids = [chunk_id for chunk_id, _ in batch]
+            texts = [chunk.page_content for _, chunk in batch]
+            metadatas = [
+                {key: value for key, value in chunk.metadata.items() if isinstance(value, (str, int, float, bool))}
+                for _, chunk in batch
+            ]
+            vectors = self._embed_with_backoff(texts)
+            with self.write_lock:
+                self.vector_store._collection.upsert(ids=ids, embeddings=vectors, documents=texts, metadatas=metadatas)
+                self.lexical_index.upsert(ids, texts, metadatas)
+            self.stats.add(chunks_embedded=len(batch))
+
+            with self.state_lock:
+                self.pending_batches[file_key] -= 1
+                done = self.pending_batches[file_key] == 0
+                entry = self.pending_entries.pop(file_key) if done else None
+            if done:
+                self._complete_file(file_key, entry)
+
+    def _embed_with_backoff(self, texts: List[str]) -> List[List[float]]:
+        for attempt in range(EMBED_MAX_RETRIES + 1):
+            wait = self.backoff_until - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                return knowledge_registry.embeddings.embed_documents(texts)
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == EMBED_MAX_RETRIES:
+                    raise
+                delay = min(60.0, 2 ** attempt) * (0.5 + random.random())
+                with self.state_lock:
+                    self.backoff_until = max(self.backoff_until, time.time() + delay)
+                self.stats.add(rate_limited=1)
+                print(f"Embedding rate limited, backing off {delay:.1f}s (attempt {attempt + 1}).")
+
+    def _complete_file(self, file_key: str, entry: dict):
+        # Only record a file once all of its chunks are stored, so an interrupted
+        # run re-processes it next time instead of leaving it half-indexed.
+        with self.state_lock:
+            self.files[file_key] = entry
+
+
+def backfill_lexical_index(vector_store: Chroma, lexical_index: LexicalIndex, batch_size: int = 500):
+    """Build the BM25 index of a store ingested before lexical indexing existed, without re-embedding."""
+    offset = 0
+    while True:
+        rows = vector_store._collection.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+        if not rows["ids"]:
+            break
+        lexical_index.upsert(rows["ids"], rows["documents"], [metadata or {} for metadata in rows["metadatas"]])
+        offset += len(rows["ids"])
+    print(f"Built lexical index for {offset} existing chunks.")
+
+
+def setup_vector_store(data_path: str, store_path: str, stats: Optional[IngestionStats] = None, chunker: str = "recursive"):
+    """Incrementally sync a Chroma store with the PDFs in ``data_path``.
+
+    Files whose hash matches the manifest are skipped entirely. New or edited
+    files go through the ``IngestionPipeline`` and only chunks that are not
+    already in the store are embedded; chunks from removed or edited files
+    that no longer exist are deleted. When the chunker differs from the one
+    recorded in the manifest every file is re-chunked.
+    """
+    stats = stats or IngestionStats()
+    text_splitter, chunker_fingerprint = create_splitter(chunker)
+
+    vector_store = knowledge_registry.open(store_path)
+    lexical_index = knowledge_registry.lexical(store_path)
+
+    manifest = load_manifest(store_path)
+    if manifest is None:
+        # Stores built before the manifest existed have random chunk IDs that
+        # cannot be reconciled, so start from an empty collection.
+        print("No manifest found for vector store, rebuilding it from scratch.")
+        vector_store.reset_collection()
+        lexical_index.reset()
+        manifest = {"version": MANIFEST_VERSION, "files": {}, "chunker": chunker_fingerprint}
+    elif manifest["files"] and lexical_index.count() == 0:
+        backfill_lexical_index(vector_store, lexical_index)
+    previous_files = manifest["files"]
+    rechunk = manifest.get("chunker", RECURSIVE_CHUNKER) != chunker_fingerprint
+    if rechunk:
+        if previous_files:
+            print(f"Chunker changed from {manifest.get('chunker', RECURSIVE_CHUNKER)} to {chunker_fingerprint}, re-chunking all files.")
+        # Forget the file hashes but keep the chunk IDs: every file is processed and rewritten again,
+        # chunks that no longer exist are deleted, and an interrupted run still resumes correctly.
+        # Unchanged text is not re-sent to the embedding API thanks to the embedding cache.
+        for entry in previous_files.values():
+            entry["sha256"] = None
+        manifest["chunker"] = chunker_fingerprint
+
+    pdf_paths = sorted(glob.glob(os.path.join(data_path, "*.pdf")))
+    current_files = {os.path.basename(path): path for path in pdf_paths}
+    stats.add(files_total=len(current_files))
+
+    # Files that disappeared from the data directory
+    for file_key in sorted(set(previous_files) - set(current_files)):
+        stale_ids = list(previous_files.pop(file_key)["chunks"])
+        if stale_ids:
+            vector_store.delete(ids=stale_ids)
+            lexical_index.delete(stale_ids)
+        stats.add(chunks_deleted=len(stale_ids))
+        print(f"Removed {len(stale_ids)} chunks for deleted file {file_key}.")
+
+    changed = {}
+    for file_key, path in current_files.items():
+        file_hash = file_sha256(path)
+        previous = previous_files.get(file_key)
+        if previous and previous["sha256"] == file_hash:
+            stats.add(files_skipped=1, chunks_skipped=len(previous["chunks"]))
+        else:
+            changed[file_key] = (path, file_hash)
+
+    try:
+        if changed:
+            IngestionPipeline(vector_store, lexical_index, manifest, stats, text_splitter).run(changed)
+            lexical_index.optimize()
+    finally:
+        # Persist whatever was completed so a failed run resumes where it stopped
+        save_manifest(store_path, manifest)
+
+    stats.finish()
+    print(f"Chroma vector store setup complete: {stats.as_dict()}")
+    return stats
+
+
+def search_vector_store(query: str, store_path: str):
+    results = knowledge_registry.search_path(store_path, query, k=4)
 
     simplified_results = [
         {
@@ -63,8 +454,9 @@ def clear_vector_store(store_path: str):
     """Properly close and delete the Chroma vector store."""
     if os.path.exists(store_path):
         try:
-            # Load the vector store to get the persistent client
-            vs = Chroma(persist_directory=store_path, embedding_function=embeddings)
+            # Use the open store's persistent client, then stop handing it out
+            vs = knowledge_registry.open(store_path)
+            knowledge_registry.close(store_path)
             vs._client.reset()  # This clears and releases the files
         except Exception as e:
             print(f"Error closing Chroma before deletion: {e}")
@@ -0,0 +1,143 @@
+import importlib
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+
+from app.core.config import STARTUP_MODE
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def _import(module: str) -> Callable[[], None]:
+    return lambda: importlib.import_module(module)
+
+
+def _open_knowledge_stores():
+    from app.utils.knowledge_registry import knowledge_registry
+
+    for name in knowledge_registry.names():
+        knowledge_registry.store(name)
+
+
+# What the first request would otherwise wait for, in dependency order
+WARMUP_STAGES: List[Tuple[str, Callable[[], None]]] = [
+    ("blockfrost_client", _import("workflow.tools.blockfrost_tool")),
+    ("knowledge_stores", _open_knowledge_stores),
+    ("cardano_agent", _import("workflow.agents.cardano_agent")),
+    ("legal_agent", _import("workflow.agents.legal_assistant")),
+    ("kickoff", _import("workflow.kickoff")),
+]
+
+
+class WarmupStage:
+    def __init__(self, name: str):
+        self.name = name
+        self.status = "pending"
+        self.seconds: Optional[float] = None
+        self.modules_loaded = 0
+        self.top_packages: List[Tuple[str, int]] = []
+        self.error: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "status": self.status,
+            "seconds": self.seconds,
+            "modules_loaded": self.modules_loaded,
+            "top_packages": dict(self.top_packages),
+            "error": self.error,
+        }
+
+
+class Warmup:
+    """Loads the agents, tools and vector stores after the API is already serving.
+
+    ``mode`` is ``background`` (warm up in a thread once the app has started),
+    ``eager`` (finish warming up before the app accepts requests) or ``lazy``
+    (load everything on the first request that needs it). Requests that
+    arrive mid warm-up simply wait on the import in progress.
+
+    Each stage records its duration and the modules it imported, grouped by
+    top-level package, as a coarse import-time profile.
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[[], None]]] = WARMUP_STAGES, mode: str = STARTUP_MODE):
+        if mode not in ("background", "eager", "lazy"):
+            raise ValueError(f"Unknown STARTUP_MODE: {mode!r} (expected 'background', 'eager' or 'lazy')")
+        self.mode = mode
+        self.stages = [(WarmupStage(name), fn) for name, fn in stages]
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """True once every stage has loaded; a failed stage keeps the app not ready."""
+        if self.mode == "lazy":
+            return True
+        return self.finished_at is not None and all(stage.status == "done" for stage, _ in self.stages)
+
+    @property
+    def failed(self) -> List[str]:
+        return [stage.name for stage, _ in self.stages if stage.status == "failed"]
+
+    def start(self):
+        if self.mode == "background":
+            threading.Thread(target=self.run, name="warmup", daemon=True).start()
+        elif self.mode == "eager":
+            self.run()
+
+    def run(self):
+        with self._lock:
+            if self.started_at is not None:
+                return
+            self.started_at = time.time()
+
+        for stage, fn in self.stages:
+            stage.status = "running"
+            before = set(sys.modules)
+            started = time.perf_counter()
+            try:
+                fn()
+                stage.status = "done"
+            except Exception as e:
+                logger.error(f"Warm-up stage {stage.name} failed: {e}", exc_info=True)
+                stage.status = "failed"
+                stage.error = str(e)
+            stage.seconds = round(time.perf_counter() - started, 3)
+            loaded = set(sys.modules) - before
+            stage.modules_loaded = len(loaded)
+            stage.top_packages = Counter(name.split(".")[0] for name in loaded).most_common(5)
+
+        self.finished_at = time.time()
+        logger.info(self.profile())
+
+    def profile(self) -> str:
+        """Human-readable import-time profile of the warm-up stages."""
+        lines = ["Warm-up profile:"]
+        for stage, _ in self.stages:
+            packages = ", ".join(f"{name} ({count})" for name, count in stage.top_packages)
+            lines.append(
+                f"  {stage.name:<18} {stage.status:<8} {stage.seconds or 0:7.2f}s "
+                f"{stage.modules_loaded:5d} modules  {packages}"
+            )
+        if self.started_at and self.finished_at:
+            lines.append(f"  total {self.finished_at - self.started_at:.2f}s")
+        return "\n".join(lines)
+
+    def status(self) -> dict:
+        end = self.finished_at or time.time()
+        return {
+            "mode": self.mode,
+            "ready": self.ready,
+            "failed_stages": self.failed,
+            "elapsed_seconds": round(end - self.started_at, 3) if self.started_at else None,
+            "stages": [stage.as_dict() for stage, _ in self.stages],
+        }
+
+
+# Shared warm-up state, started by the app on startup
+warmup = Warmup()
@@ -0,0 +1,357 @@
+"""
+Offline end-to-end benchmark of the agent endpoints.
+
+Swaps ChatGoogleGenerativeAI and GoogleGenerativeAIEmbeddings for deterministic
+local fakes before the agents are imported, serves Blockfrost from the synthetic
+fixtures (replay transport) and builds the knowledge bases with the fake
+embeddings under --workdir, so the whole request path - gateway middleware,
+executor, LangGraph graphs, tools, retrieval and checkpointing - runs without
+network or API keys.
+
+The fake chat model follows a scripted tool-call plan per question (see
+CARDANO_SCENARIOS and LEGAL_SCENARIOS) and answers once the plan is done, with
+configurable latency. /query and /legalquery are driven together, in process
+through httpx's ASGI transport, at each --levels concurrency; every request
+starts a new conversation thread. Reports p50/p95/p99 latency and throughput
+per endpoint and level, plus process RSS.
+
+Usage:
+    python -m test.bench_agents --levels 1 4 16 32 --requests 64 --llm-latency-ms 50
+    python -m test.bench_agents --json bench_agents.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+TOKEN_HEADER = {"Secret-token": "unihack25"}
+TEST_ADDRESS = "addr_test1wryf65umuw5nuh8m4sjh9dka0mx7pwsmle0uyex8pf7f4ycj7y6tp"
+TEST_TX_HASH = "4bcba01d2c775b545c783bbd49a9443bb0ac071c743c86eeddd6a814852288e5"
+
+# (question, tool calls the fake model makes in order before answering)
+CARDANO_SCENARIOS = [
+    (f"What happened in transaction {TEST_TX_HASH}?", [("get_single_transaction_details", {"tx_hash": TEST_TX_HASH})]),
+    (f"What is the balance of {TEST_ADDRESS}?", [("get_address_details", {"address": TEST_ADDRESS})]),
+    (f"List the latest transactions of {TEST_ADDRESS}", [("get_transactions_for_address", {"address": TEST_ADDRESS})]),
+    ("How does staking work on Cardano?", [("search_cardano_knowledge", {"query": "staking delegation rewards"})]),
+    (
+        f"Explain the fees paid by {TEST_ADDRESS} and how Cardano fees are calculated",
+        [
+            ("get_transactions_for_address", {"address": TEST_ADDRESS}),
+            ("search_cardano_knowledge", {"query": "transaction fee calculation"}),
+        ],
+    ),
+    ("Hello, who are you?", []),
+]
+
+# (question, domain, tool calls); with routing on, a domain is searched by the route node first
+LEGAL_SCENARIOS = [
+    ("What makes a power of attorney valid?", "civil law", [("search_civil_law_knowledge", {"query": "power of attorney validity"})]),
+    ("How do I register a company?", "corporate law", [("search_corporate_law_knowledge", {"query": "company registration"})]),
+    ("What are the requirements for a valid lease agreement?", "property law", [("search_legal_property_law_knowledge", {"query": "lease agreement"})]),
+    (
+        "Can a company own land and grant a power of attorney over it?",
+        "",
+        [("search_all_legal_knowledge", {"query": "company land ownership power of attorney"})],
+    ),
+    ("Who can transfer land on behalf of a director?", "", [
+        ("search_legal_property_law_knowledge", {"query": "land transfer"}),
+        ("search_corporate_law_knowledge", {"query": "director authority"}),
+    ]),
+]
+
+# Set from the command line before the agents are built
+FAKE_SETTINGS = {"llm_latency_ms": 0.0, "llm_jitter_ms": 0.0, "embed_latency_ms": 0.0, "seed": 0}
+
+
+def configure_environment(workdir: str):
+    """Point every external dependency and writable path at offline, throwaway equivalents."""
+    os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+    os.environ.setdefault("BLOCKFROST_TRANSPORT", "replay")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+    os.environ.setdefault("EMBEDDING_CACHE_PATH", os.path.join(workdir, "embedding_cache.sqlite3"))
+    # Fresh conversation history on every run
+    os.environ.setdefault("CHECKPOINT_DIR", tempfile.mkdtemp(prefix="bench-checkpoints-"))
+
+
+def install_fakes():
+    """Replace the Gemini chat and embedding classes; must run before the agents are imported."""
+    from typing import Any, List, Optional
+
+    import langchain_google_genai
+    from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    plans = {question: plan for question, plan in CARDANO_SCENARIOS}
+    plans.update({question: plan for question, _, plan in LEGAL_SCENARIOS})
+
+    def sleep(latency_ms: float, jitter_ms: float, key: str):
+        # Jitter derived from the input, so a run is reproducible for a given seed
+        jitter = random.Random(f"{FAKE_SETTINGS['seed']}:{key}").uniform(-jitter_ms, jitter_ms) if jitter_ms else 0.0
+        delay = max(0.0, latency_ms + jitter) / 1000
+        if delay:
+            time.sleep(delay)
+
+    class FakeGeminiChat(BaseChatModel):
+        """Deterministic stand-in for ChatGoogleGenerativeAI that follows the scripted tool plans."""
+
+        model: str = "fake-gemini"
+        temperature: float = 0.0
+        google_api_key: Optional[str] = None
+        bound_tools: List[str] = []
+
+        @property
+        def _llm_type(self) -> str:
+            return "fake-gemini"
+
+        def _get_ls_params(self, stop=None, **kwargs):
+            return {"ls_provider": "fake", "ls_model_name": self.model, "ls_model_type": "chat"}
+
+        def bind_tools(self, tools, **kwargs: Any):
+            return self.model_copy(update={"bound_tools": [getattr(tool, "name", getattr(tool, "__name__", "")) for tool in tools]})
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+            last_human = max((i for i, message in enumerate(messages) if isinstance(message, HumanMessage)), default=-1)
+            question = messages[last_human].content if last_human >= 0 else ""
+            turn = messages[last_human + 1:]
+            called = {call["name"] for message in turn if isinstance(message, AIMessage) for call in message.tool_calls}
+            sleep(FAKE_SETTINGS["llm_latency_ms"], FAKE_SETTINGS["llm_jitter_ms"], f"{question}:{len(turn)}")
+
+            pending = [
+                (name, args) for name, args in plans.get(question, [])
+                if name in self.bound_tools and name not in called
+            ]
+            if pending:
+                name, args = pending[0]
+                message = AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{len(turn)}_{name}"}])
+            elif self.bound_tools:
+                results = [message for message in turn if isinstance(message, ToolMessage)]
+                evidence = " ".join(str(result.content)[:120] for result in results)
+                message = AIMessage(content=f"Based on {len(results)} tool result(s): {evidence}".strip())
+            else:
+                # Unbound model: the compaction summarizer
+                message = AIMessage(content="Summary of the earlier conversation.")
+
+            # Rough token counts (4 characters per token) so the usage metrics move like the real model's
+            input_tokens = sum(len(str(prompt.content)) for prompt in messages) // 4
+            output_tokens = len(message.content) // 4 + 8 * len(message.tool_calls)
+            message.usage_metadata = {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            }
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+    class FakeGeminiEmbeddings(Embeddings):
+        """Deterministic stand-in for GoogleGenerativeAIEmbeddings (768 dimensions, hash-seeded)."""
+
+        def __init__(self, model: str = "fake-embedding", google_api_key: str = None, **kwargs: Any):
+            self.model = model
+            self.fake = DeterministicFakeEmbedding(size=768)
+
+        def embed_documents(self, texts):
+            sleep(FAKE_SETTINGS["embed_latency_ms"], 0.0, "documents")
+            return self.fake.embed_documents(texts)
+
+        def embed_query(self, text):
+            sleep(FAKE_SETTINGS["embed_latency_ms"], 0.0, "query")
+            return self.fake.embed_query(text)
+
+    langchain_google_genai.ChatGoogleGenerativeAI = FakeGeminiChat
+    langchain_google_genai.GoogleGenerativeAIEmbeddings = FakeGeminiEmbeddings
+
+
+def build_knowledge_bases(workdir: str):
+    """Ingest ./data into fake-embedding stores under workdir; unchanged files are skipped on later runs."""
+    from app.utils.knowledge_registry import knowledge_registry
+
+    for name in knowledge_registry.names():
+        knowledge_registry.knowledge_bases[name]["store_path"] = os.path.join(workdir, name)
+
+    from app.utils.vectorize import setup_vector_store
+
+    for name in knowledge_registry.names():
+        data_path, store_path = knowledge_registry.paths(name)
+        started = time.perf_counter()
+        setup_vector_store(data_path, store_path, chunker=knowledge_registry.chunker(name))
+        print(f"  {name:<15} ready in {time.perf_counter() - started:.1f}s")
+
+
+def rss_mb() -> float:
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def request_plan(total: int, thread_ids):
+    """Alternate /query and /legalquery over the scripted questions, each in a new thread."""
+    cardano = itertools.cycle(CARDANO_SCENARIOS)
+    legal = itertools.cycle(LEGAL_SCENARIOS)
+    for i in range(total):
+        if i % 2 == 0:
+            question, _ = next(cardano)
+            yield "/query/", {"thread_id": next(thread_ids), "user_input": question, "lang": "en"}
+        else:
+            question, domain, _ = next(legal)
+            yield "/legalquery/", {"thread_id": next(thread_ids), "domain": domain, "user_input": question, "lang": "en"}
+
+
+async def run_level(client, concurrency: int, requests: int, thread_ids) -> dict:
+    from workflow.kickoff import AGENT_ERROR_PREFIX
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in request_plan(requests, thread_ids):
+        queue.put_nowait(item)
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    failures = defaultdict(int)
+
+    async def worker():
+        while not queue.empty():
+            path, body = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.post(path, json=body, headers=TOKEN_HEADER)
+            latencies[path].append(time.perf_counter() - started)
+            statuses[path][response.status_code] += 1
+            if response.status_code >= 400 or response.json().get("answer", "").startswith(AGENT_ERROR_PREFIX):
+                failures[path] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    rows = []
+    for path in sorted(latencies):
+        values = latencies[path]
+        rows.append({
+            "endpoint": path.rstrip("/"),
+            "concurrency": concurrency,
+            "requests": len(values),
+            "requests_per_second": round(len(values) / elapsed, 2),
+            "p50_ms": round(statistics.median(values) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "failures": failures[path],
+            "statuses": dict(statuses[path]),
+        })
+    return {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(requests / elapsed, 2),
+        "rss_mb": round(rss_mb(), 1),
+        "endpoints": rows,
+    }
+
+
+async def run(args) -> dict:
+    import httpx
+    from app.main import app
+    from app.utils.warmup import warmup
+
+    # No lifespan events over the ASGI transport; load agents and stores before measuring
+    warmup.run()
+    thread_ids = itertools.count(random.Random(args.seed).randrange(1, 2**40))
+    levels = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        with contextlib.redirect_stdout(io.StringIO()) if args.quiet else contextlib.nullcontext():
+            await run_level(client, 2, args.warmup_requests, thread_ids)
+        baseline_rss = rss_mb()
+        for concurrency in args.levels:
+            with contextlib.redirect_stdout(io.StringIO()) if args.quiet else contextlib.nullcontext():
+                levels.append(await run_level(client, concurrency, args.requests, thread_ids))
+    from app.utils.metrics import TOOL_ERRORS, TOOL_SECONDS
+
+    # Confirms the scripted plans ran: calls per tool over the whole run, warm-up included
+    tools = sorted({name for _, plan in CARDANO_SCENARIOS for name, _ in plan} | {name for _, _, plan in LEGAL_SCENARIOS for name, _ in plan})
+    return {
+        "settings": {key: getattr(args, key) for key in ("levels", "requests", "llm_latency_ms", "llm_jitter_ms", "embed_latency_ms", "seed")},
+        "baseline_rss_mb": round(baseline_rss, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "tool_calls": {name: {"calls": TOOL_SECONDS.count(tool=name), "errors": int(TOOL_ERRORS.value(tool=name))} for name in tools},
+        "levels": levels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of /query and /legalquery with a fake LLM")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 32], help="Concurrent clients per load level")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per load level, split across both endpoints")
+    parser.add_argument("--warmup-requests", type=int, default=8)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="Fake chat model latency per call")
+    parser.add_argument("--llm-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=5.0, help="Fake embedding latency per call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default="./db/bench", help="Fake-embedding knowledge bases and embedding cache")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--verbose", dest="quiet", action="store_false", help="Keep the tools' console output and INFO logs")
+    args = parser.parse_args()
+
+    FAKE_SETTINGS.update(
+        llm_latency_ms=args.llm_latency_ms, llm_jitter_ms=args.llm_jitter_ms, embed_latency_ms=args.embed_latency_ms, seed=args.seed
+    )
+    configure_environment(args.workdir)
+    if args.quiet:
+        # Installs the root handler first, so the app's basicConfig(level=INFO) calls are no-ops
+        logging.basicConfig(level=logging.WARNING)
+        for name in ("app", "workflow"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+        # 503s from a saturated executor are counted in the report instead
+        logging.getLogger("app.access").setLevel(logging.ERROR)
+    install_fakes()
+    print(f"Building knowledge bases in {args.workdir}")
+    build_knowledge_bases(args.workdir)
+
+    results = asyncio.run(run(args))
+
+    print(f"\n{'level':>5} {'endpoint':<12} {'req':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'fail':>5}  statuses")
+    for level in results["levels"]:
+        for row in level["endpoints"]:
+            print(
+                f"{row['concurrency']:>5} {row['endpoint']:<12} {row['requests']:>5} {row['requests_per_second']:>8} "
+                f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row['failures']:>5}  {row['statuses']}"
+            )
+        print(f"{level['concurrency']:>5} {'total':<12} {'':>5} {level['requests_per_second']:>8}   RSS {level['rss_mb']} MB")
+    print(f"\nRSS after warm-up {results['baseline_rss_mb']} MB, peak {results['peak_rss_mb']} MB")
+    print("Tool calls: " + ", ".join(f"{name} {stats['calls']} ({stats['errors']} errors)" for name, stats in results["tool_calls"].items()))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
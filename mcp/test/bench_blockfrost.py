@@ -0,0 +1,118 @@
+"""
+Offline throughput benchmark for the Blockfrost tool layer.
+
+Runs the Cardano tools concurrently against the synthetic fixtures, either through
+the local mock server (real HTTP, configurable latency and errors) or through
+the replay transport (no sockets at all), and reports latency percentiles,
+throughput and the shared client's cache / rate-limiter stats.
+
+Usage:
+    python -m test.bench_blockfrost --concurrency 16 --calls 400 --latency-ms 80
+    python -m test.bench_blockfrost --mode replay --cold
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+TEST_ADDRESS = "addr_test1wryf65umuw5nuh8m4sjh9dka0mx7pwsmle0uyex8pf7f4ycj7y6tp"
+TEST_TX_HASH = "4bcba01d2c775b545c783bbd49a9443bb0ac071c743c86eeddd6a814852288e5"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_mock_server(args, port: int):
+    import uvicorn
+    from test.mock_blockfrost import build_app
+
+    app = build_app(args.fixtures, args.latency_ms, args.jitter_ms, args.error_rate, args.error_status, args.seed)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Blockfrost tools against fixtures")
+    parser.add_argument("--mode", choices=["mock", "replay"], default="mock")
+    parser.add_argument("--fixtures", default="./test/fixtures/blockfrost")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cold", action="store_true", help="Clear the response cache before every call")
+    args = parser.parse_args()
+
+    # Configuration is read at import time, so set it before importing anything from the app
+    os.environ["BLOCKFROST_FIXTURES_DIR"] = args.fixtures
+    if args.mode == "mock":
+        port = free_port()
+        os.environ["BLOCKFROST_BASE_URL"] = f"http://127.0.0.1:{port}/api/v0"
+        os.environ["BLOCKFROST_TRANSPORT"] = "live"
+        start_mock_server(args, port)
+    else:
+        os.environ["BLOCKFROST_TRANSPORT"] = "replay"
+
+    from workflow.tools import blockfrost_tool
+
+    calls = [
+        (blockfrost_tool.get_address_details, {"address": TEST_ADDRESS}),
+        (blockfrost_tool.get_transactions_for_address, {"address": TEST_ADDRESS}),
+        (blockfrost_tool.get_cardano_transaction, {"tx_hash": TEST_TX_HASH}),
+        (blockfrost_tool.analyze_transaction_flow, {"tx_hash": TEST_TX_HASH}),
+        (blockfrost_tool.get_single_transaction_details, {"tx_hash": TEST_TX_HASH}),
+    ]
+
+    latencies = []
+    failures = 0
+    lock = threading.Lock()
+
+    def run(i: int):
+        nonlocal failures
+        tool, tool_input = calls[i % len(calls)]
+        if args.cold:
+            blockfrost_tool.blockfrost_client.cache.clear()
+        started = time.perf_counter()
+        result = str(tool.invoke(tool_input))
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if "error" in result.lower() or "failed" in result.lower():
+                failures += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(run, range(args.calls)))
+    wall = time.perf_counter() - started
+
+    print(f"mode={args.mode} concurrency={args.concurrency} calls={args.calls} cold={args.cold}")
+    print(f"throughput: {args.calls / wall:.1f} tool calls/s over {wall:.2f}s")
+    print(
+        f"latency ms: p50={percentile(latencies, 50) * 1000:.1f} "
+        f"p95={percentile(latencies, 95) * 1000:.1f} "
+        f"p99={percentile(latencies, 99) * 1000:.1f} "
+        f"mean={statistics.mean(latencies) * 1000:.1f}"
+    )
+    print(f"failed tool calls: {failures}")
+    print(f"client stats: {blockfrost_tool.blockfrost_client.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Micro-benchmark of the API middleware stack on /health.
+
+Builds the same bare app three times - without middleware, with the previous
+pair of BaseHTTPMiddleware layers (token check and per-IP rate limit, kept
+below for comparison) and with the pure-ASGI GatewayMiddleware, each behind
+CORS like app.main - and drives it in-process through httpx's ASGI transport,
+so the numbers measure middleware overhead rather than sockets.
+
+Usage:
+    python -m test.bench_middleware --requests 5000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import defaultdict
+
+# Quotas high enough that the benchmark measures the limiter's cost, not its 429s
+os.environ.setdefault("RATE_LIMIT_DEFAULT", "100000000/1")
+os.environ.setdefault("RATE_LIMIT_TOKEN", "100000000/1")
+os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0.01")
+
+TOKEN_HEADER = {"Secret-token": "unihack25"}
+
+
+def legacy_middleware():
+    """The middleware app.main used before GatewayMiddleware, minus its per-request prints."""
+    from fastapi import Request, Response
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    class SecurityCustomHeaderCheckMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            if request.url.path in ["/docs", "/redoc", "/openapi.json"]:
+                return await call_next(request)
+            if request.headers.get("Secret-token") == "unihack25":
+                return await call_next(request)
+            return Response(content="Invalid or missing security token", status_code=401)
+
+    class RateLimitMiddleware(BaseHTTPMiddleware):
+        def __init__(self, app, rate_limit: float = 0.0):
+            super().__init__(app)
+            self.rate_limit_records = defaultdict(float)
+            self.rate_limit = rate_limit
+            self.lock = asyncio.Lock()
+
+        async def dispatch(self, request: Request, call_next):
+            client_ip = request.client.host
+            current_time = time.time()
+            async with self.lock:
+                if current_time - self.rate_limit_records.get(client_ip, 0) < self.rate_limit:
+                    return Response(content="Rate limit exceeded", status_code=429)
+                self.rate_limit_records[client_ip] = current_time
+            start_time = time.time()
+            response = await call_next(request)
+            response.headers["X-Process-Time"] = f"{time.time() - start_time:.4f} seconds"
+            return response
+
+    return [(SecurityCustomHeaderCheckMiddleware, {}), (RateLimitMiddleware, {"rate_limit": 0.0})]
+
+
+def build_app(stack: str):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "ok"}
+
+    if stack == "legacy":
+        for middleware, options in legacy_middleware():
+            app.add_middleware(middleware, **options)
+    elif stack == "gateway":
+        from app.api.middleware import GatewayMiddleware
+
+        app.add_middleware(GatewayMiddleware)
+    app.add_middleware(CORSMiddleware, allow_origins=["http://localhost:3000"], allow_methods=["*"], allow_headers=["*"])
+    return app
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run(stack: str, requests: int, concurrency: int) -> dict:
+    import httpx
+
+    app = build_app(stack)
+    latencies = []
+    statuses = defaultdict(int)
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        # Warm up routing and lazy imports outside the measurement
+        for _ in range(50):
+            await client.get("/health", headers=TOKEN_HEADER)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.get("/health", headers=TOKEN_HEADER)
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "stack": stack,
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "statuses": dict(statuses),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the API middleware stack on /health")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--stacks", nargs="+", default=["none", "legacy", "gateway"], choices=["none", "legacy", "gateway"])
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(stack, args.requests, args.concurrency)) for stack in args.stacks]
+    print(f"{'stack':<10} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}  statuses")
+    for result in results:
+        print(
+            f"{result['stack']:<10} {result['requests_per_second']:>10} {result['p50_ms']:>9} "
+            f"{result['p99_ms']:>9}  {result['statuses']}"
+        )
+    by_stack = {result["stack"]: result for result in results}
+    if "legacy" in by_stack and "gateway" in by_stack:
+        speedup = by_stack["gateway"]["requests_per_second"] / by_stack["legacy"]["requests_per_second"]
+        print(f"gateway vs legacy: {speedup:.2f}x requests/s")
+
+
+if __name__ == "__main__":
+    main()
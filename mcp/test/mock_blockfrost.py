@@ -0,0 +1,84 @@
+"""
+Local Blockfrost stand-in that serves fixtures (recorded or synthetic).
+
+Serves /txs/{hash}, /txs/{hash}/utxos, /txs/{hash}/metadata, /addresses/{addr}
+and /addresses/{addr}/transactions (with or without the /api/v0 prefix) from
+BLOCKFROST_FIXTURES_DIR, with optional latency and error injection, so the
+Blockfrost tools and the Cardano agent can be exercised without network.
+
+Usage:
+    python -m test.mock_blockfrost --port 8100 --latency-ms 80 --error-rate 0.05
+    BLOCKFROST_BASE_URL=http://127.0.0.1:8100/api/v0 uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import random
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.core.config import BLOCKFROST_FIXTURES_DIR
+from app.utils.replay_adapter import FixtureStore
+
+
+def build_app(
+    fixtures_dir: str = BLOCKFROST_FIXTURES_DIR,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    error_status: int = 429,
+    seed: int = 0,
+) -> FastAPI:
+    fixtures = FixtureStore(fixtures_dir)
+    rng = random.Random(seed)
+    app = FastAPI(title="Mock Blockfrost")
+    app.state.requests = 0
+    app.state.errors = 0
+
+    @app.get("/{path:path}")
+    async def serve(path: str, request: Request):
+        app.state.requests += 1
+        delay = latency_ms + (rng.uniform(-jitter_ms, jitter_ms) if jitter_ms else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        if error_rate and rng.random() < error_rate:
+            app.state.errors += 1
+            return JSONResponse(
+                status_code=error_status,
+                content={"status_code": error_status, "error": "Injected error", "message": "Injected by mock"},
+            )
+
+        fixture = fixtures.find(f"/{path}", request.url.query)
+        if fixture is None:
+            return JSONResponse(
+                status_code=404,
+                content={"status_code": 404, "error": "Not Found", "message": "The requested component has not been found."},
+            )
+
+        return JSONResponse(status_code=fixture.get("status", 200), content=fixture["body"])
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve Blockfrost fixtures locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--fixtures", default=BLOCKFROST_FIXTURES_DIR)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        build_app(args.fixtures, args.latency_ms, args.jitter_ms, args.error_rate, args.error_status, args.seed),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
@@ -0,0 +1,86 @@
+"""
+BoundedMemorySaver against a real compiled graph.
+
+The pruning and size accounting depend on InMemorySaver's internal layout,
+so these run several multi-turn threads through LangGraph and check what
+the graph and stats() see, to catch a langgraph upgrade that changes it.
+
+Usage:
+    python -m pytest test/test_checkpointer.py
+"""
+
+import operator
+from typing import Annotated, List, TypedDict
+
+from langgraph.graph import END, START, StateGraph
+
+from workflow.checkpointer import BoundedMemorySaver
+
+TURNS = 4
+
+
+class ChatState(TypedDict):
+    messages: Annotated[List[str], operator.add]
+
+
+def build_graph(saver: BoundedMemorySaver):
+    graph = StateGraph(ChatState)
+    graph.add_node("agent", lambda state: {"messages": [f"answer {len(state['messages'])}"]})
+    graph.add_node("tools", lambda state: {"messages": ["tool result"]})
+    graph.add_edge(START, "agent")
+    graph.add_edge("agent", "tools")
+    graph.add_edge("tools", END)
+    return graph.compile(checkpointer=saver)
+
+
+def converse(app, thread_id: str) -> List[str]:
+    config = {"configurable": {"thread_id": thread_id}}
+    for turn in range(TURNS):
+        state = app.invoke({"messages": [f"question {turn}"]}, config)
+    return state["messages"]
+
+
+def test_prunes_history_and_evicts_threads():
+    saver = BoundedMemorySaver(ttl=3600, max_threads=2, max_bytes=1 << 30, keep_per_thread=2)
+    app = build_graph(saver)
+
+    for thread_id in ("1", "2", "3"):
+        messages = converse(app, thread_id)
+        # The latest checkpoints still carry the whole conversation
+        assert len(messages) == TURNS * 3
+        assert messages[-3:] == [f"question {TURNS - 1}", f"answer {TURNS * 3 - 2}", "tool result"]
+
+    stats = saver.stats()
+    assert stats["threads"] == 2
+    assert stats["evicted"] == 1
+    assert stats["approx_bytes"] > 0
+
+    for thread_id in ("2", "3"):
+        history = list(app.get_state_history({"configurable": {"thread_id": thread_id}}))
+        assert len(history) == 2
+        assert len(history[0].values["messages"]) == TURNS * 3
+
+    # The least recently used thread was dropped and starts over
+    assert list(app.get_state_history({"configurable": {"thread_id": "1"}})) == []
+    assert len(app.invoke({"messages": ["again"]}, {"configurable": {"thread_id": "1"}})["messages"]) == 3
+
+
+def test_size_accounting_returns_to_zero():
+    saver = BoundedMemorySaver(ttl=3600, max_threads=2, max_bytes=1 << 30, keep_per_thread=2)
+    app = build_graph(saver)
+    for thread_id in ("1", "2"):
+        converse(app, thread_id)
+
+    for thread_id in ("1", "2"):
+        saver.delete_thread(thread_id)
+    assert saver.stats() == {"backend": "memory", "threads": 0, "approx_bytes": 0, "evicted": 0}
+
+
+def test_memory_ceiling_keeps_the_active_thread():
+    saver = BoundedMemorySaver(ttl=3600, max_threads=10, max_bytes=1, keep_per_thread=2)
+    app = build_graph(saver)
+    for thread_id in ("1", "2"):
+        converse(app, thread_id)
+
+    assert saver.stats()["threads"] == 1
+    assert len(list(app.get_state_history({"configurable": {"thread_id": "2"}}))) == 2
@@ -1,12 +1,15 @@
 from typing import TypedDict, Annotated, Literal
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langgraph.graph.message import add_messages
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import ToolNode
 from workflow.tools.blockfrost_tool import get_address_details, get_transactions_for_address, get_single_transaction_details
 from workflow.tools.knowledge_base_tool import search_cardano_knowledge, get_cardano_faq
+from workflow.callbacks import graph_config
+from workflow.checkpointer import create_checkpointer
+from workflow.compaction import make_compaction_node
+from workflow.streaming import stream_graph
 from app.core.config import GEMINI_MODEL, TEMPERATURE, GOOGLE_API_KEY
 
 import logging
@@ -71,9 +74,11 @@ class CardanoAgent:
             return {"messages": state["messages"] + tool_results["messages"]}
 
         workflow = StateGraph(AgentState)
+        workflow.add_node("compact", make_compaction_node(self.model))
         workflow.add_node("agent", call_model)
         workflow.add_node("tools", self.tool_node)
-        workflow.add_edge(START, "agent")
+        workflow.add_edge(START, "compact")
+        workflow.add_edge("compact", "agent")
         workflow.add_conditional_edges(
             "agent",
             should_continue,
@@ -84,7 +89,7 @@ class CardanoAgent:
         )
         workflow.add_edge("tools", "agent")
 
-        checkpointer = MemorySaver()
+        checkpointer = create_checkpointer("cardano")
         graph = workflow.compile(checkpointer=checkpointer)
         return graph
     
@@ -100,6 +105,18 @@ class CardanoAgent:
         else:
             return False
 
+    def record_exchange(self, thread_id: int, user_input: str, answer: str):
+        """
+        Appends a question and its answer to a thread without running the graph,
+        so follow-up questions still see an answer that was served from cache.
+        """
+        messages = []
+        if self.is_new_thread(thread_id):
+            messages.append(SystemMessage(content=self.system_prompt))
+        messages.extend([HumanMessage(content=user_input), AIMessage(content=answer)])
+        config = {"configurable": {"thread_id": str(thread_id)}}
+        self.graph.update_state(config, {"messages": messages}, as_node="agent")
+
 def chat(graph: StateGraph, thread_id: int, user_input: str) -> str:
     try:
          # Detect if this is a new thread by checking existing state
@@ -118,7 +135,7 @@ def chat(graph: StateGraph, thread_id: int, user_input: str) -> str:
             "context": "",
             "response": ""
         }
-        config = {"configurable": {"thread_id": thread_id}}
+        config = graph_config("cardano", thread_id)
         result = graph.invoke(initial_state, config)
         final_message = result["messages"][-1]
         if hasattr(final_message, 'content'):
@@ -150,6 +167,26 @@ def kickoff_cardanoAgent(thread_id: int, user_input: str):
     response = chatbot.chat(user_input)
     return response
 
+def kickoff_cardanoAgent_stream(thread_id: int, user_input: str):
+    """
+    Streaming variant of kickoff_cardanoAgent: yields (event, data) progress
+    events while the graph runs and returns the final answer.
+    """
+    messages = []
+    if agent.is_new_thread(thread_id):
+        print("Starting a new thread.")
+        messages.append(SystemMessage(content=agent.system_prompt))
+    messages.append(HumanMessage(content=user_input))
+
+    initial_state = {
+        "messages": messages,
+        "user_query": user_input,
+        "context": "",
+        "response": ""
+    }
+    config = graph_config("cardano", thread_id)
+    return (yield from stream_graph(graph, initial_state, config))
+
 if __name__ == "__main__":
     # Example usage
     thread_id = 1
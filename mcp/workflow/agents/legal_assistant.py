@@ -1,7 +1,7 @@
+import uuid
 from typing import TypedDict, Annotated, Literal
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langgraph.graph.message import add_messages
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import ToolNode
@@ -9,8 +9,14 @@ from workflow.tools.legal_data_tool import (
     search_legal_property_law_knowledge,
     search_civil_law_knowledge,
     search_corporate_law_knowledge,
+    search_all_legal_knowledge,
 )
-from app.core.config import GEMINI_MODEL, TEMPERATURE, GOOGLE_API_KEY
+from workflow.callbacks import graph_config
+from workflow.checkpointer import create_checkpointer
+from workflow.compaction import make_compaction_node
+from workflow.routing import resolve_domain
+from workflow.streaming import stream_graph
+from app.core.config import GEMINI_MODEL, TEMPERATURE, GOOGLE_API_KEY, ROUTING_ENABLED
 
 import logging
 logger = logging.getLogger(__name__)
@@ -20,6 +26,7 @@ class AgentState(TypedDict):
     user_query: str
     context: str
     response: str
+    domain: str
 
 class LawyerAgent:
     def __init__(self):
@@ -32,6 +39,7 @@ class LawyerAgent:
             "- Use `search_legal_property_law_knowledge` for search legal property law knowledge\n"
             "- Use `search_civil_law_knowledge` for searching civil law knowledge\n"
             "- Use `search_corporate_law_knowledge` for searching corporate law knowledge\n"
+            "- Use `search_all_legal_knowledge` when a question spans several areas of law, instead of calling the tools above one by one\n"
             "only use these tools when necessary.\n"
         )
         self.model = ChatGoogleGenerativeAI(
@@ -43,10 +51,18 @@ class LawyerAgent:
             search_legal_property_law_knowledge,
             search_civil_law_knowledge,
             search_corporate_law_knowledge,
+            search_all_legal_knowledge,
         ]
         self.llm_with_tools = self.model.bind_tools(self.tools)
+        # Knowledge base tool per routed domain; a routed turn binds only that tool
+        self.domain_tools = {
+            "property_law": search_legal_property_law_knowledge,
+            "civil_law": search_civil_law_knowledge,
+            "corporate_law": search_corporate_law_knowledge,
+        }
+        self.routed_llms = {domain: self.model.bind_tools([tool]) for domain, tool in self.domain_tools.items()}
         self.tool_node = ToolNode(self.tools)
-        self.memory = MemorySaver()
+        self.memory = create_checkpointer("legal")
         self.graph = self._build_graph()
 
     def _build_graph(self) -> StateGraph:
@@ -56,9 +72,30 @@ class LawyerAgent:
                 return "tools"
             return "end"
 
+        def route(state: AgentState) -> AgentState:
+            """
+            Resolves the knowledge base for this turn and searches it up front,
+            recorded as a regular tool call so the model can answer straight away.
+            """
+            domain = resolve_domain(state.get("domain"), state["user_query"]) if ROUTING_ENABLED else None
+            if not domain:
+                return {"domain": ""}
+            tool = self.domain_tools[domain]
+            call_id = f"route_{uuid.uuid4().hex}"
+            result = tool.invoke({"query": state["user_query"]})
+            logger.info(f"Routed legal question to {domain}")
+            return {
+                "domain": domain,
+                "messages": [
+                    AIMessage(content="", tool_calls=[{"name": tool.name, "args": {"query": state["user_query"]}, "id": call_id}]),
+                    ToolMessage(content=result, name=tool.name, tool_call_id=call_id),
+                ],
+            }
+
         def call_model(state: AgentState) -> AgentState:
             messages = state["messages"]
-            response = self.llm_with_tools.invoke(messages)
+            llm = self.routed_llms.get(state.get("domain"), self.llm_with_tools)
+            response = llm.invoke(messages)
             return {"messages": [response]}
 
         def call_tools(state: AgentState) -> AgentState:
@@ -67,9 +104,13 @@ class LawyerAgent:
             return {"messages": state["messages"] + tool_results["messages"]}
 
         workflow = StateGraph(AgentState)
+        workflow.add_node("compact", make_compaction_node(self.model))
+        workflow.add_node("route", route)
         workflow.add_node("agent", call_model)
         workflow.add_node("tools", self.tool_node)
-        workflow.add_edge(START, "agent")
+        workflow.add_edge(START, "compact")
+        workflow.add_edge("compact", "route")
+        workflow.add_edge("route", "agent")
         workflow.add_conditional_edges(
             "agent",
             should_continue,
@@ -95,10 +136,23 @@ class LawyerAgent:
         else:
             return False
 
+    def record_exchange(self, thread_id: int, user_input: str, answer: str):
+        """
+        Appends a question and its answer to a thread without running the graph,
+        so follow-up questions still see an answer that was served from cache.
+        """
+        messages = []
+        if self.is_new_thread(thread_id):
+            messages.append(SystemMessage(content=self.system_prompt))
+        messages.extend([HumanMessage(content=user_input), AIMessage(content=answer)])
+        config = {"configurable": {"thread_id": str(thread_id)}}
+        self.graph.update_state(config, {"messages": messages}, as_node="agent")
+
 def chat(
     agent: LawyerAgent,
     thread_id: int,
-    user_input: str
+    user_input: str,
+    domain: str = ""
 ) -> str:
     try:
         # Detect if this is a new thread by checking existing state
@@ -115,9 +169,10 @@ def chat(
             "messages": messages,
             "user_query": user_input,
             "context": "",
-            "response": ""
+            "response": "",
+            "domain": domain
         }
-        config = {"configurable": {"thread_id": str(thread_id)}}
+        config = graph_config("legal", thread_id)
         result = agent.graph.invoke(initial_state, config)
         final_message = result["messages"][-1]
         if hasattr(final_message, 'content'):
@@ -138,14 +193,36 @@ def chat(
 agent = LawyerAgent()
 
 class LawChatbot:
-    def __init__(self, thread_id: int = 0):
+    def __init__(self, thread_id: int = 0, domain: str = ""):
         self.thread_id = thread_id
+        self.domain = domain
 
     def chat(self, user_input: str) -> str:
-        return chat(agent, self.thread_id, user_input)
+        return chat(agent, self.thread_id, user_input, self.domain)
 
 def kickoff_legalAgent(thread_id: int, domain: str, user_input: str):
-    chatbot = LawChatbot(thread_id=thread_id)
+    chatbot = LawChatbot(thread_id=thread_id, domain=domain)
     response = chatbot.chat(user_input)
     return response
 
+def kickoff_legalAgent_stream(thread_id: int, domain: str, user_input: str):
+    """
+    Streaming variant of kickoff_legalAgent: yields (event, data) progress
+    events while the graph runs and returns the final answer.
+    """
+    messages = []
+    if agent.is_new_thread(thread_id):
+        print("Starting a new thread.")
+        messages.append(SystemMessage(content=agent.system_prompt))
+    messages.append(HumanMessage(content=user_input))
+
+    initial_state = {
+        "messages": messages,
+        "user_query": user_input,
+        "context": "",
+        "response": "",
+        "domain": domain
+    }
+    config = graph_config("legal", thread_id)
+    return (yield from stream_graph(agent.graph, initial_state, config))
+
@@ -0,0 +1,193 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.utils.metrics import GRAPH_NODE_SECONDS, LLM_SECONDS, LLM_TOKENS, TOOL_ERRORS, TOOL_SECONDS
+from app.utils.tracing import tracing
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Records graph node, tool and chat model timings and token counts.
+
+    One instance is shared by every agent run; in-flight runs are tracked by
+    their callback ``run_id``. The agent name comes from the ``agent`` key of
+    the run metadata set by ``graph_config``.
+    """
+
+    def __init__(self):
+        self._runs: Dict[UUID, Tuple[float, str, Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, kind: str, **labels):
+        with self._lock:
+            self._runs[run_id] = (time.perf_counter(), kind, labels)
+
+    def _finish(self, run_id: UUID) -> Optional[Tuple[float, str, Dict[str, str]]]:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return None
+        started, kind, labels = run
+        return time.perf_counter() - started, kind, labels
+
+    # Graph nodes: a node's own chain run is named after the node; runs nested in it inherit the metadata
+    def on_chain_start(self, serialized, inputs, *, run_id: UUID, metadata: Optional[dict] = None, **kwargs: Any):
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            self._start(run_id, "node", agent=(metadata or {}).get("agent", ""), node=node)
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any):
+        finished = self._finish(run_id)
+        if finished:
+            GRAPH_NODE_SECONDS.observe(finished[0], **finished[2])
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self.on_chain_end(None, run_id=run_id)
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id, "tool", tool=kwargs.get("name") or (serialized or {}).get("name", "unknown"))
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs: Any):
+        finished = self._finish(run_id)
+        if finished:
+            TOOL_SECONDS.observe(finished[0], **finished[2])
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        finished = self._finish(run_id)
+        if finished:
+            TOOL_SECONDS.observe(finished[0], **finished[2])
+            TOOL_ERRORS.inc(**finished[2])
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, metadata: Optional[dict] = None, **kwargs: Any):
+        self._start(run_id, "llm", model=(metadata or {}).get("ls_model_name", "unknown"))
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        finished = self._finish(run_id)
+        if not finished:
+            return
+        elapsed, _, labels = finished
+        LLM_SECONDS.observe(elapsed, **labels)
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                if usage:
+                    LLM_TOKENS.inc(usage.get("input_tokens", 0), direction="input", **labels)
+                    LLM_TOKENS.inc(usage.get("output_tokens", 0), direction="output", **labels)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        finished = self._finish(run_id)
+        if finished:
+            LLM_SECONDS.observe(finished[0], **finished[2])
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Opens a trace span for the graph run, each node, each tool call and each chat model call.
+
+    Spans are registered with ``app.utils.tracing`` under their callback
+    ``run_id``, and a run's span is parented to its nearest ancestor run
+    that has one (nodes wrap several internal chain runs that get no span
+    of their own). The graph run itself nests under the current span,
+    i.e. the agent run and request that started it.
+    """
+
+    # Ancestor chains are short; this only guards against a broken parent map
+    MAX_DEPTH = 64
+
+    def __init__(self):
+        # Chain runs without a span of their own, mapped to their parent run
+        self._parents: Dict[UUID, Optional[UUID]] = {}
+        self._lock = threading.Lock()
+
+    def _parent_span(self, parent_run_id: Optional[UUID]):
+        for _ in range(self.MAX_DEPTH):
+            if parent_run_id is None:
+                return None
+            span = tracing.run_span(parent_run_id)
+            if span is not None:
+                return span
+            parent_run_id = self._parents.get(parent_run_id)
+        return None
+
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], name: str, **attributes):
+        span = tracing.start_span(name, parent=self._parent_span(parent_run_id), attributes=attributes)
+        tracing.bind_run(run_id, span)
+
+    @staticmethod
+    def _end(run_id: UUID, error: BaseException = None, **attributes):
+        span = tracing.unbind_run(run_id)
+        if span is None:
+            return False
+        tracing.annotate(span, **attributes)
+        if error is not None:
+            from opentelemetry.trace import Status, StatusCode
+
+            span.record_exception(error)
+            span.set_status(Status(StatusCode.ERROR, str(error)))
+        span.end()
+        return True
+
+    def on_chain_start(
+        self, serialized, inputs, *, run_id: UUID, parent_run_id: Optional[UUID] = None, metadata: Optional[dict] = None, **kwargs: Any
+    ):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        if parent_run_id is None:
+            self._start(run_id, None, f"graph {metadata.get('agent', kwargs.get('name', ''))}".strip(), thread_id=metadata.get("thread_id"))
+        elif node and kwargs.get("name") == node:
+            self._start(run_id, parent_run_id, f"node {node}", node=node, step=metadata.get("langgraph_step"))
+        else:
+            with self._lock:
+                self._parents[run_id] = parent_run_id
+
+    def on_chain_end(self, outputs, *, run_id: UUID, **kwargs: Any):
+        if not self._end(run_id):
+            with self._lock:
+                self._parents.pop(run_id, None)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        if not self._end(run_id, error):
+            with self._lock:
+                self._parents.pop(run_id, None)
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, parent_run_id: Optional[UUID] = None, **kwargs: Any):
+        name = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+        self._start(run_id, parent_run_id, f"tool {name}", tool=name, input_chars=len(input_str or ""))
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, output_chars=len(str(getattr(output, "content", output))))
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, error)
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id: UUID, parent_run_id: Optional[UUID] = None, metadata: Optional[dict] = None, **kwargs: Any
+    ):
+        model = (metadata or {}).get("ls_model_name", "unknown")
+        self._start(run_id, parent_run_id, f"llm {model}", model=model, messages=sum(len(batch) for batch in messages))
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any):
+        usage = {}
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or usage
+        self._end(run_id, input_tokens=usage.get("input_tokens"), output_tokens=usage.get("output_tokens"))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id, error)
+
+
+# Shared handlers attached to every agent run
+metrics_callback = MetricsCallbackHandler()
+tracing_callback = TracingCallbackHandler()
+
+
+def graph_config(agent: str, thread_id) -> dict:
+    """Run config for an agent graph: its conversation thread plus the instrumentation callbacks."""
+    return {
+        "configurable": {"thread_id": str(thread_id)},
+        "callbacks": [metrics_callback, tracing_callback] if tracing.enabled else [metrics_callback],
+        "metadata": {"agent": agent},
+    }
@@ -0,0 +1,277 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Sequence, Set
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from app.core.config import (
+    CHECKPOINT_BACKEND,
+    CHECKPOINT_DIR,
+    CHECKPOINT_THREAD_TTL_SECONDS,
+    CHECKPOINT_MAX_THREADS,
+    CHECKPOINT_MAX_MEMORY_MB,
+    CHECKPOINT_KEEP_PER_THREAD,
+)
+
+import logging
+logger = logging.getLogger(__name__)
+
+# The SQLite backend looks for expired / excess threads every this many checkpoints
+SWEEP_EVERY = 200
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """In-process checkpointer with per-thread TTL, LRU eviction, history pruning and a memory ceiling.
+
+    Like the SQLite backend, only the latest ``keep_per_thread`` checkpoints
+    of a thread are kept, with their pending writes and the channel values
+    they still reference. Memory use is approximated by the serialized size
+    of each thread's checkpoints and channel values. After every checkpoint,
+    idle threads past ``ttl`` are dropped, then least recently used threads
+    until both ``max_threads`` and ``max_bytes`` hold. The thread being
+    written is never evicted by its own write.
+    """
+
+    def __init__(self, ttl: float, max_threads: int, max_bytes: int, keep_per_thread: int):
+        super().__init__()
+        self.ttl = ttl
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        # Pending writes of the previous checkpoint are still needed while the next step runs
+        self.keep_per_thread = max(2, keep_per_thread)
+        self.evicted = 0
+        # (thread_id, checkpoint_ns, checkpoint_id) -> blob keys of the channel versions it references
+        self._checkpoint_blobs: Dict[tuple, Set[tuple]] = {}
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._blob_keys: Dict[str, Set[tuple]] = {}
+        self._write_keys: Dict[str, Set[tuple]] = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            next_config = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = config["configurable"]["thread_id"]
+            checkpoint_ns = config["configurable"]["checkpoint_ns"]
+            blob_keys = self._blob_keys.setdefault(thread_id, set())
+            added = 0
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                blob_keys.add(key)
+                added += len(self.blobs[key][1])
+            saved, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            added += len(saved[1]) + len(saved_metadata[1])
+            self._checkpoint_blobs[(thread_id, checkpoint_ns, checkpoint["id"])] = {
+                (thread_id, checkpoint_ns, channel, version) for channel, version in checkpoint["channel_versions"].items()
+            }
+            added -= self._prune(thread_id, checkpoint_ns)
+            self._sizes[thread_id] = self._sizes.get(thread_id, 0) + added
+            self._total_bytes += added
+            self._touch(thread_id)
+            self._evict(keep=thread_id)
+            return next_config
+
+    def put_writes(self, config, writes: Sequence[tuple], task_id: str, task_path: str = "") -> None:
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            thread_id = config["configurable"]["thread_id"]
+            outer_key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+            self._write_keys.setdefault(thread_id, set()).add(outer_key)
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> int:
+        """Drop all but the latest checkpoints of a thread and the blobs only they used; returns bytes freed."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.keep_per_thread:
+            return 0
+        freed = 0
+        write_keys = self._write_keys.get(thread_id, set())
+        # Checkpoint ids are time-ordered, as the SQLite backend's ORDER BY checkpoint_id relies on
+        for checkpoint_id in sorted(checkpoints)[:-self.keep_per_thread]:
+            saved, saved_metadata, _ = checkpoints.pop(checkpoint_id)
+            freed += len(saved[1]) + len(saved_metadata[1])
+            self._checkpoint_blobs.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            write_keys.discard((thread_id, checkpoint_ns, checkpoint_id))
+
+        live = set()
+        for checkpoint_id in checkpoints:
+            live |= self._checkpoint_blobs.get((thread_id, checkpoint_ns, checkpoint_id), set())
+        blob_keys = self._blob_keys.get(thread_id, set())
+        for key in [key for key in blob_keys if key[1] == checkpoint_ns and key not in live]:
+            blob_keys.discard(key)
+            blob = self.blobs.pop(key, None)
+            if blob is not None:
+                freed += len(blob[1])
+        return freed
+
+    def delete_thread(self, thread_id: str) -> None:
+        # Uses the per-thread key index instead of scanning every blob like the base class
+        with self._lock:
+            for checkpoint_ns, checkpoints in self.storage.pop(thread_id, {}).items():
+                for checkpoint_id in checkpoints:
+                    self._checkpoint_blobs.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            for key in self._blob_keys.pop(thread_id, ()):
+                self.blobs.pop(key, None)
+            for key in self._write_keys.pop(thread_id, ()):
+                self.writes.pop(key, None)
+            self._total_bytes -= self._sizes.pop(thread_id, 0)
+            self._last_used.pop(thread_id, None)
+
+    def _touch(self, thread_id: str):
+        self._last_used[thread_id] = time.monotonic()
+        self._last_used.move_to_end(thread_id)
+
+    def _evict(self, keep: str):
+        expires_before = time.monotonic() - self.ttl
+        while self._last_used:
+            thread_id, last_used = next(iter(self._last_used.items()))
+            if thread_id == keep:
+                break
+            over_limit = len(self._last_used) > self.max_threads or self._total_bytes > self.max_bytes
+            if last_used >= expires_before and not over_limit:
+                break
+            self.delete_thread(thread_id)
+            self.evicted += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "threads": len(self._last_used),
+                "approx_bytes": self._total_bytes,
+                "evicted": self.evicted,
+            }
+
+
+class BoundedSqliteSaver(SqliteSaver):
+    """SQLite (WAL) checkpointer with per-thread TTL, LRU eviction and history pruning.
+
+    Several uvicorn workers can share the same file, so a conversation can
+    continue on whichever worker receives the next request. Only the latest
+    ``keep_per_thread`` checkpoints of a thread are kept; older ones are only
+    needed for time travel, which the agents do not use. Thread activity is
+    recorded in the database itself so that TTL and ``max_threads`` apply
+    across workers.
+    """
+
+    def __init__(self, path: str, ttl: float, max_threads: int, keep_per_thread: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        super().__init__(conn)
+        self.path = path
+        self.ttl = ttl
+        self.max_threads = max_threads
+        # Pending writes of the previous checkpoint are still needed while the next step runs
+        self.keep_per_thread = max(2, keep_per_thread)
+        self.evicted = 0
+        self._puts = 0
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.executescript(
+            """
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS thread_activity (
+                thread_id TEXT PRIMARY KEY,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS thread_activity_last_used ON thread_activity (last_used);
+            """
+        )
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT INTO thread_activity (thread_id, last_used) VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET last_used = excluded.last_used",
+                (thread_id, time.time()),
+            )
+            keep = (thread_id, checkpoint_ns, thread_id, checkpoint_ns, self.keep_per_thread)
+            recent = (
+                "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT ?"
+            )
+            cur.execute(
+                f"DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ({recent})",
+                keep,
+            )
+            cur.execute(
+                f"DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id NOT IN ({recent})",
+                keep,
+            )
+        self._puts += 1
+        if self._puts % SWEEP_EVERY == 0:
+            self.sweep()
+        return next_config
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+
+    def sweep(self) -> int:
+        """Delete threads idle for longer than the TTL, then the least recently used beyond ``max_threads``."""
+        with self.cursor() as cur:
+            cutoff = time.time() - self.ttl
+            victims = [row[0] for row in cur.execute("SELECT thread_id FROM thread_activity WHERE last_used < ?", (cutoff,))]
+            live = cur.execute("SELECT COUNT(*) FROM thread_activity WHERE last_used >= ?", (cutoff,)).fetchone()[0]
+            if live > self.max_threads:
+                victims += [
+                    row[0]
+                    for row in cur.execute(
+                        "SELECT thread_id FROM thread_activity WHERE last_used >= ? ORDER BY last_used LIMIT ?",
+                        (cutoff, live - self.max_threads),
+                    )
+                ]
+            for thread_id in victims:
+                for table in ("checkpoints", "writes", "thread_activity"):
+                    cur.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+        if victims:
+            self.evicted += len(victims)
+            logger.info(f"Evicted {len(victims)} idle conversation threads from {self.path}")
+        return len(victims)
+
+    def stats(self) -> dict:
+        with self.cursor(transaction=False) as cur:
+            threads = cur.execute("SELECT COUNT(*) FROM thread_activity").fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "threads": threads,
+            "approx_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            "evicted": self.evicted,
+        }
+
+
+def create_checkpointer(name: str, backend: str = CHECKPOINT_BACKEND) -> BaseCheckpointSaver:
+    """Build the conversation checkpointer for one agent, e.g. ``create_checkpointer("cardano")``."""
+    if backend == "memory":
+        return BoundedMemorySaver(
+            ttl=CHECKPOINT_THREAD_TTL_SECONDS,
+            max_threads=CHECKPOINT_MAX_THREADS,
+            max_bytes=int(CHECKPOINT_MAX_MEMORY_MB * 1024 * 1024),
+            keep_per_thread=CHECKPOINT_KEEP_PER_THREAD,
+        )
+    if backend == "sqlite":
+        saver = BoundedSqliteSaver(
+            os.path.join(CHECKPOINT_DIR, f"{name}.sqlite3"),
+            ttl=CHECKPOINT_THREAD_TTL_SECONDS,
+            max_threads=CHECKPOINT_MAX_THREADS,
+            keep_per_thread=CHECKPOINT_KEEP_PER_THREAD,
+        )
+        saver.sweep()
+        return saver
+    raise ValueError(f"Unknown CHECKPOINT_BACKEND: {backend!r} (expected 'sqlite' or 'memory')")
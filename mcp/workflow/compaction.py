@@ -0,0 +1,153 @@
+import json
+from typing import Callable, List
+
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+
+from workflow.streaming import message_text
+from app.core.config import (
+    COMPACTION_ENABLED,
+    COMPACTION_TOKEN_BUDGET,
+    COMPACTION_KEEP_TURNS,
+    COMPACTION_TOOL_CHARS,
+)
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Separates the agent's own system prompt from the running summary appended to it
+SUMMARY_HEADER = "\n\n## Summary of the earlier conversation\n"
+
+SUMMARY_PROMPT = (
+    "Summarize the conversation below for an assistant that will continue it. "
+    "Keep every fact the user may refer back to: addresses, transaction hashes, amounts, "
+    "names, legal provisions and the conclusions given. Be concise and use bullet points.\n\n"
+)
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    """Rough prompt size (about 4 characters per token); good enough to compare against a budget."""
+    chars = 0
+    for message in messages:
+        chars += len(message_text(message.content)) + 16
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            chars += len(json.dumps([call["args"] for call in tool_calls], default=str))
+    return chars // 4
+
+
+def _turn_starts(messages: List[BaseMessage]) -> List[int]:
+    return [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+
+
+def _elide(message: ToolMessage, limit: int) -> ToolMessage:
+    content = message_text(message.content)
+    elided = f"{content[:limit]}\n[... {len(content) - limit} characters of earlier tool output elided]"
+    return message.model_copy(update={"content": elided, "additional_kwargs": {**message.additional_kwargs, "compacted": True}})
+
+
+def _transcript(messages: List[BaseMessage]) -> str:
+    lines = []
+    for message in messages:
+        text = message_text(message.content)
+        if isinstance(message, ToolMessage):
+            lines.append(f"[tool {message.name}]: {text}")
+        elif getattr(message, "tool_calls", None):
+            calls = ", ".join(call["name"] for call in message.tool_calls)
+            lines.append(f"{message.type}: {text} (called tools: {calls})")
+        elif text:
+            lines.append(f"{message.type}: {text}")
+    return "\n".join(lines)
+
+
+def compact_messages(
+    messages: List[BaseMessage],
+    summarize: Callable[[str], str],
+    token_budget: int = COMPACTION_TOKEN_BUDGET,
+    keep_turns: int = COMPACTION_KEEP_TURNS,
+    tool_chars: int = COMPACTION_TOOL_CHARS,
+) -> List[BaseMessage]:
+    """Return the message updates (replacements and removals) that compact a thread.
+
+    1. Tool outputs from earlier turns are cut to ``tool_chars`` characters;
+       the model already answered from them.
+    2. If the thread is still over ``token_budget``, every turn before the
+       last ``keep_turns`` is summarized into the leading system message and
+       removed. Turns always start at a user message, so tool calls and their
+       results are never separated.
+
+    The current turn is never modified. Updates reuse message ids, so the
+    ``add_messages`` reducer replaces messages in place.
+    """
+    turns = _turn_starts(messages)
+    if not turns:
+        return []
+    current_turn = turns[-1]
+    updates = {}
+
+    for i, message in enumerate(messages[:current_turn]):
+        if (
+            isinstance(message, ToolMessage)
+            and not message.additional_kwargs.get("compacted")
+            and len(message_text(message.content)) > tool_chars
+        ):
+            updates[i] = _elide(message, tool_chars)
+
+    compacted = [updates.get(i, message) for i, message in enumerate(messages)]
+    if estimate_tokens(compacted) <= token_budget or len(turns) <= keep_turns:
+        return list(updates.values())
+
+    window_start = turns[-keep_turns] if keep_turns > 0 else current_turn
+    system = compacted[0] if isinstance(compacted[0], SystemMessage) else None
+    older = compacted[1 if system else 0:window_start]
+    if not older:
+        return list(updates.values())
+
+    base_prompt, _, previous_summary = message_text(system.content).partition(SUMMARY_HEADER) if system else ("", "", "")
+    transcript = _transcript(older)
+    if previous_summary:
+        transcript = f"Earlier summary:\n{previous_summary}\n\nLater messages:\n{transcript}"
+    try:
+        summary = summarize(SUMMARY_PROMPT + transcript).strip()
+    except Exception as e:
+        logger.warning(f"Conversation summary failed, keeping full history: {e}")
+        return list(updates.values())
+
+    result = [RemoveMessage(id=message.id) for message in older]
+    if system:
+        result.append(system.model_copy(update={"content": base_prompt + SUMMARY_HEADER + summary}))
+    else:
+        # No system prompt to extend: the summary takes the place of the first removed message
+        result[0] = SystemMessage(content=SUMMARY_HEADER.strip() + "\n" + summary, id=older[0].id)
+    # Elided tool messages inside the recent window still need their replacement
+    result.extend(message for i, message in updates.items() if i >= window_start)
+    return result
+
+
+def make_compaction_node(model):
+    """Graph node that compacts the thread before the model sees it.
+
+    ``model`` is the plain chat model (without tools), used for summaries.
+    """
+    def summarize(prompt: str) -> str:
+        return message_text(model.invoke([HumanMessage(content=prompt)]).content)
+
+    def compact(state: dict) -> dict:
+        messages = state["messages"]
+        if not COMPACTION_ENABLED:
+            return {}
+        before = estimate_tokens(messages)
+        updates = compact_messages(messages, summarize)
+        if not updates:
+            logger.info(f"Prompt tokens (est.): {before}, no compaction needed")
+            return {}
+
+        replaced = {message.id: message for message in updates if not isinstance(message, RemoveMessage)}
+        removed = {message.id for message in updates if isinstance(message, RemoveMessage)}
+        after = estimate_tokens([replaced.get(m.id, m) for m in messages if m.id not in removed or m.id in replaced])
+        logger.info(
+            f"Prompt tokens (est.): {before} before compaction, {after} after "
+            f"({len(removed)} messages summarized, {len(replaced)} rewritten)"
+        )
+        return {"messages": updates}
+
+    return compact
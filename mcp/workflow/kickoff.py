@@ -1,5 +1,78 @@
-from workflow.agents.cardano_agent import kickoff_cardanoAgent
-from workflow.agents.legal_assistant import kickoff_legalAgent
+from workflow.agents.cardano_agent import kickoff_cardanoAgent, kickoff_cardanoAgent_stream, agent as cardano_agent
+from workflow.agents.legal_assistant import kickoff_legalAgent, kickoff_legalAgent_stream, agent as legal_agent
+from workflow.routing import normalize_domain
+from app.core.config import ANSWER_CACHE_ENABLED
+from app.utils.answer_cache import answer_cache
+from app.utils.tracing import tracing
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Prefix of the message the agents return instead of raising; never cached
+AGENT_ERROR_PREFIX = "I encountered an error"
+
+
+def legal_cache_domain(domain: str) -> str:
+    return "legal:" + (normalize_domain(domain) or (domain or "").strip().lower().replace(" ", "_"))
+
+
+def _cache_lookup(cache_domain: str, user_input: str):
+    """Answer cache lookup that fails open: an error (e.g. a rate-limited embedding call) is a miss."""
+    try:
+        return answer_cache.lookup(cache_domain, user_input)
+    except Exception:
+        logger.warning(f"Answer cache lookup failed for {cache_domain}, running the agent", exc_info=True)
+        return None
+
+
+def _cache_store(cache_domain: str, user_input: str, response: str):
+    """Cache an agent answer; a failure is logged and the answer is still returned."""
+    if not response or response.startswith(AGENT_ERROR_PREFIX):
+        return
+    try:
+        answer_cache.store(cache_domain, user_input, response)
+    except Exception:
+        logger.warning(f"Answer cache store failed for {cache_domain}", exc_info=True)
+
+
+def run_cached(agent, cache_domain: str, thread_id: int, user_input: str, run) -> str:
+    """Serve the first question of a new thread from the answer cache when possible.
+
+    Follow-up questions always run the agent, since their answer depends on
+    the thread's history.
+    """
+    with tracing.span(f"agent {cache_domain.split(':')[0]}", thread_id=thread_id, cache_domain=cache_domain) as span:
+        is_new = ANSWER_CACHE_ENABLED and agent.is_new_thread(thread_id)
+        if is_new:
+            answer = _cache_lookup(cache_domain, user_input)
+            tracing.annotate(span, answer_cache="hit" if answer else "miss")
+            if answer:
+                agent.record_exchange(thread_id, user_input, answer)
+                return answer
+
+        response = run()
+        if is_new:
+            _cache_store(cache_domain, user_input, response)
+        return response
+
+
+def stream_cached(agent, cache_domain: str, thread_id: int, user_input: str, stream):
+    """Streaming counterpart of run_cached; a cached answer is sent as a single token event."""
+    with tracing.span(f"agent {cache_domain.split(':')[0]}", thread_id=thread_id, cache_domain=cache_domain, stream=True) as span:
+        is_new = ANSWER_CACHE_ENABLED and agent.is_new_thread(thread_id)
+        if is_new:
+            answer = _cache_lookup(cache_domain, user_input)
+            tracing.annotate(span, answer_cache="hit" if answer else "miss")
+            if answer:
+                agent.record_exchange(thread_id, user_input, answer)
+                yield "token", {"text": answer}
+                return answer
+
+        response = yield from stream()
+        if is_new:
+            _cache_store(cache_domain, user_input, response)
+        return response
+
 
 def run_cardano_agent(thread_id: int, user_input: str):
     """Kickoff function to start the agent with a thread ID and user input.
@@ -11,7 +84,10 @@ def run_cardano_agent(thread_id: int, user_input: str):
         None
     """
     try:
-        response = kickoff_cardanoAgent(thread_id, user_input)
+        response = run_cached(
+            cardano_agent, "cardano", thread_id, user_input,
+            lambda: kickoff_cardanoAgent(thread_id, user_input),
+        )
         return response
     except Exception as e:
         print(f"An error occurred: {e}")
@@ -27,8 +103,47 @@ def run_legal_agent(thread_id: int, domain: str, user_input: str):
         None
     """
     try:
-        response = kickoff_legalAgent(thread_id, domain, user_input)
+        response = run_cached(
+            legal_agent, legal_cache_domain(domain), thread_id, user_input,
+            lambda: kickoff_legalAgent(thread_id, domain, user_input),
+        )
+        return response
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return None
+
+
+def stream_cardano_agent(thread_id: int, user_input: str):
+    """Streaming variant of run_cardano_agent.
+    Yields:
+        (event, data) tuples: "token", "tool_call" and "tool_result" events.
+    Returns:
+        The final answer, or None if the agent failed.
+    """
+    try:
+        response = yield from stream_cached(
+            cardano_agent, "cardano", thread_id, user_input,
+            lambda: kickoff_cardanoAgent_stream(thread_id, user_input),
+        )
         return response
     except Exception as e:
         print(f"An error occurred: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def stream_legal_agent(thread_id: int, domain: str, user_input: str):
+    """Streaming variant of run_legal_agent.
+    Yields:
+        (event, data) tuples: "token", "tool_call" and "tool_result" events.
+    Returns:
+        The final answer, or None if the agent failed.
+    """
+    try:
+        response = yield from stream_cached(
+            legal_agent, legal_cache_domain(domain), thread_id, user_input,
+            lambda: kickoff_legalAgent_stream(thread_id, domain, user_input),
+        )
+        return response
+    except Exception as e:
+        print(f"An error occurred: {e}")
+        return None
@@ -0,0 +1,122 @@
+import re
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import ROUTING_MIN_SIMILARITY, ROUTING_MIN_MARGIN
+
+import logging
+logger = logging.getLogger(__name__)
+
+LEGAL_DOMAINS = ("property_law", "civil_law", "corporate_law")
+
+# Accepted spellings of the `domain` request field, after normalize_domain's cleanup
+DOMAIN_ALIASES = {
+    "property_law": "property_law",
+    "property": "property_law",
+    "legal_property": "property_law",
+    "legal_property_law": "property_law",
+    "real_estate": "property_law",
+    "land_law": "property_law",
+    "civil_law": "civil_law",
+    "civil": "civil_law",
+    "contract_law": "civil_law",
+    "family_law": "civil_law",
+    "corporate_law": "corporate_law",
+    "corporate": "corporate_law",
+    "company_law": "corporate_law",
+    "business_law": "corporate_law",
+    "commercial_law": "corporate_law",
+}
+
+# What each knowledge base covers; the classifier compares questions against these
+DOMAIN_DESCRIPTIONS = {
+    "property_law": (
+        "Property law: ownership and transfer of land and real estate, deeds, title registration, "
+        "leases and tenancy, mortgages, easements, condominiums, inheritance of property."
+    ),
+    "civil_law": (
+        "Civil law: contracts and obligations, civil liability and damages, family matters, "
+        "marriage and divorce, succession, persons and legal capacity, civil procedure."
+    ),
+    "corporate_law": (
+        "Corporate law: company formation and registration, shareholders, directors and boards, "
+        "articles of association, mergers and acquisitions, insolvency, corporate governance."
+    ),
+}
+
+
+def normalize_domain(domain: Optional[str]) -> Optional[str]:
+    """Map a free-form domain such as ``"Property Law"`` or ``"corporate-law"`` to a knowledge base name."""
+    key = re.sub(r"[^a-z]+", "_", (domain or "").lower()).strip("_")
+    return DOMAIN_ALIASES.get(key)
+
+
+class DomainClassifier:
+    """Picks the legal knowledge base for a question by embedding similarity.
+
+    Each domain is represented by the embedding of its description. A
+    question is routed only when the best domain is similar enough and
+    clearly ahead of the runner-up; otherwise the agent keeps all tools and
+    decides itself.
+    """
+
+    def __init__(
+        self,
+        embeddings: Optional[Embeddings] = None,
+        min_similarity: float = ROUTING_MIN_SIMILARITY,
+        min_margin: float = ROUTING_MIN_MARGIN,
+    ):
+        self._embeddings = embeddings
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self._prototypes: Optional[Dict[str, np.ndarray]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        if self._embeddings is None:
+            from app.utils.knowledge_registry import knowledge_registry
+
+            self._embeddings = knowledge_registry.embeddings
+        return self._embeddings
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _load_prototypes(self) -> Dict[str, np.ndarray]:
+        with self._lock:
+            if self._prototypes is None:
+                vectors = self.embeddings.embed_documents(list(DOMAIN_DESCRIPTIONS.values()))
+                self._prototypes = {
+                    domain: self._normalize(vector) for domain, vector in zip(DOMAIN_DESCRIPTIONS, vectors)
+                }
+            return self._prototypes
+
+    def classify(self, question: str) -> Optional[str]:
+        try:
+            prototypes = self._load_prototypes()
+            query = self._normalize(self.embeddings.embed_query(question))
+        except Exception as e:
+            logger.warning(f"Domain classification failed: {e}")
+            return None
+        scores = sorted(((float(query @ vector), domain) for domain, vector in prototypes.items()), reverse=True)
+        (best, domain), (runner_up, _) = scores[0], scores[1]
+        if best < self.min_similarity or best - runner_up < self.min_margin:
+            logger.info(f"No confident domain for question (best {domain} at {best:.3f}, margin {best - runner_up:.3f})")
+            return None
+        return domain
+
+
+def resolve_domain(domain: Optional[str], question: str) -> Optional[str]:
+    """Knowledge base for a legal question: the requested domain if recognised, else the classifier's pick."""
+    return normalize_domain(domain) or domain_classifier.classify(question)
+
+
+# Shared classifier; domain prototypes are embedded on first use
+domain_classifier = DomainClassifier()
@@ -0,0 +1,47 @@
+from typing import Any, Generator, Optional, Tuple
+
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+# (event name, JSON-serialisable payload) pairs produced while an agent runs
+StreamEvent = Tuple[str, dict]
+
+
+def message_text(content: Any) -> str:
+    """Flatten message content, including Gemini's list-of-blocks format, to text."""
+    if isinstance(content, list):
+        return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+    return content or ""
+
+
+def stream_graph(graph, initial_state: dict, config: dict) -> Generator[StreamEvent, None, Optional[str]]:
+    """Run a compiled agent graph and yield progress events as they happen.
+
+    Yields ``("token", {"text"})`` for every model token, ``("tool_call",
+    {"name", "args"})`` when the model requests a tool and ``("tool_result",
+    {"name", "status"})`` when a tool finishes. Tokens of a turn that ends in
+    tool calls are streamed too, so clients should treat text received before
+    a ``tool_call`` as provisional. Returns the final answer text.
+    """
+    answer = None
+    for mode, chunk in graph.stream(initial_state, config, stream_mode=["messages", "updates"]):
+        if mode == "messages":
+            message, metadata = chunk
+            if metadata.get("langgraph_node") == "agent" and isinstance(message, (AIMessageChunk, AIMessage)):
+                text = message_text(message.content)
+                if text:
+                    yield "token", {"text": text}
+            continue
+
+        for node, update in chunk.items():
+            # Model, tool and routing steps are progress; compaction only rewrites history
+            if node not in ("agent", "tools", "route") or not isinstance(update, dict):
+                continue
+            for message in update.get("messages", []):
+                if isinstance(message, ToolMessage):
+                    yield "tool_result", {"name": message.name, "status": message.status}
+                elif isinstance(message, AIMessage) and message.tool_calls:
+                    for call in message.tool_calls:
+                        yield "tool_call", {"name": call["name"], "args": call["args"]}
+                elif isinstance(message, AIMessage):
+                    answer = message_text(message.content)
+    return answer
@@ -1,12 +1,34 @@
 import requests
 import cbor2
+import contextvars
+import random
+import time
 from datetime import datetime
-from types import SimpleNamespace
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List
+from requests.adapters import HTTPAdapter
 from langchain_core.tools import tool
-from app.core.config import BLOCKFROST_PROJECT_ID
-from blockfrost import BlockFrostApi, ApiError, ApiUrls
-from app.utils.data_formatter import format_transaction_data, format_utxo_data
+from app.core.config import (
+    BLOCKFROST_PROJECT_ID,
+    BLOCKFROST_BASE_URL,
+    BLOCKFROST_POOL_SIZE,
+    BLOCKFROST_TIMEOUT,
+    BLOCKFROST_CACHE_MAX_ENTRIES,
+    BLOCKFROST_IMMUTABLE_TTL,
+    BLOCKFROST_ADDRESS_TTL,
+    BLOCKFROST_MAX_CONCURRENCY,
+    BLOCKFROST_HISTORY_COUNT,
+    BLOCKFROST_RATE_LIMIT,
+    BLOCKFROST_BURST,
+    BLOCKFROST_MAX_RETRIES,
+    BLOCKFROST_TRANSPORT,
+    BLOCKFROST_FIXTURES_DIR,
+)
+from app.utils.data_formatter import format_transaction_data, format_utxo_data, format_transaction_metadata
+from app.utils.ttl_cache import TTLCache
+from app.utils.token_bucket import TokenBucket
+from app.utils.replay_adapter import ReplayAdapter
+from app.utils.tracing import tracing
 import logging
 
 # Configure logging
@@ -14,47 +36,143 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class BlockfrostClient:
+    """Shared Blockfrost client for every Cardano tool.
+
+    Uses one pooled keep-alive HTTP session. Confirmed transaction data never
+    changes, so it is cached for a long time; address data is cached briefly.
+    Concurrent requests for the same resource are coalesced into one call.
+
+    Every request takes a token from a bucket sized to the Blockfrost quota,
+    with interactive requests served before background work, and 429/5xx
+    responses are retried with jittered exponential backoff.
+    """
+
     def __init__(self):
         self.project_id = BLOCKFROST_PROJECT_ID
-        self.base_url = ApiUrls.preview.value
+        # The SDK's ApiUrls values omit the API version that raw requests need
+        base_url = BLOCKFROST_BASE_URL.rstrip("/")
+        self.base_url = base_url if base_url.endswith("/v0") else f"{base_url}/v0"
+
+        self.session = requests.Session()
+        self.session.headers.update({"project_id": self.project_id or ""})
+        if BLOCKFROST_TRANSPORT == "live":
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=BLOCKFROST_POOL_SIZE)
+        else:
+            # Record live responses to, or replay them from, BLOCKFROST_FIXTURES_DIR
+            adapter = ReplayAdapter(BLOCKFROST_TRANSPORT, BLOCKFROST_FIXTURES_DIR, pool_connections=1, pool_maxsize=BLOCKFROST_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.cache = TTLCache(max_entries=BLOCKFROST_CACHE_MAX_ENTRIES)
+        self.fan_out = ThreadPoolExecutor(max_workers=BLOCKFROST_MAX_CONCURRENCY, thread_name_prefix="blockfrost")
+        self.limiter = TokenBucket(rate=BLOCKFROST_RATE_LIMIT, burst=BLOCKFROST_BURST)
+        self.retries = 0
+
+    def _request(self, path: str, params: Dict[str, Any] = None) -> Any:
+        # One span per logical request, covering throttling, retries and backoff
+        with tracing.span("blockfrost GET", path=path) as span:
+            throttled = 0.0
+            for attempt in range(BLOCKFROST_MAX_RETRIES + 1):
+                throttled += self.limiter.acquire()
+                tracing.annotate(span, attempts=attempt + 1, throttled_ms=round(throttled * 1000, 1))
+                try:
+                    response = self.session.get(f"{self.base_url}{path}", params=params, timeout=BLOCKFROST_TIMEOUT)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    if attempt == BLOCKFROST_MAX_RETRIES:
+                        raise
+                    self._backoff(attempt, None)
+                    continue
+
+                tracing.annotate(span, status_code=response.status_code)
+                retryable = response.status_code == 429 or response.status_code >= 500
+                if not retryable or attempt == BLOCKFROST_MAX_RETRIES:
+                    response.raise_for_status()
+                    return response.json()
+                if response.status_code == 429:
+                    # The server's view of the quota wins; stop handing out tokens until it refills
+                    self.limiter.drain()
+                self._backoff(attempt, response.headers.get("Retry-After"))
+
+    def _backoff(self, attempt: int, retry_after: str = None):
+        self.retries += 1
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = min(8.0, 0.25 * 2 ** attempt)
+        time.sleep(delay * (0.5 + random.random()))
+
+    def _get(self, path: str, ttl: float, params: Dict[str, Any] = None) -> Any:
+        key = (path, tuple(sorted((params or {}).items())))
+        return self.cache.get_or_load(key, ttl, lambda: self._request(path, params))
 
-        self.api = BlockFrostApi(
-            project_id=self.project_id,
-            base_url=self.base_url
-        )
-    
     def get_transaction(self, tx_hash: str) -> Dict[str, Any]:
         """Get transaction details from Blockfrost API"""
         try:
-            url = f"{self.base_url}/txs/{tx_hash}"
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get(f"/txs/{tx_hash}", BLOCKFROST_IMMUTABLE_TTL)
         except requests.exceptions.RequestException as e:
             return {"error": f"Failed to fetch transaction: {str(e)}"}
     
     def get_transaction_utxos(self, tx_hash: str) -> Dict[str, Any]:
         """Get transaction UTXOs from Blockfrost API"""
         try:
-            url = f"{self.base_url}/txs/{tx_hash}/utxos"
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get(f"/txs/{tx_hash}/utxos", BLOCKFROST_IMMUTABLE_TTL)
         except requests.exceptions.RequestException as e:
             return {"error": f"Failed to fetch UTXOs: {str(e)}"}
     
+    def get_transaction_metadata(self, tx_hash: str) -> Any:
+        """Get transaction metadata labels from Blockfrost API"""
+        try:
+            return self._get(f"/txs/{tx_hash}/metadata", BLOCKFROST_IMMUTABLE_TTL)
+        except requests.exceptions.RequestException as e:
+            return {"error": f"Failed to fetch transaction metadata: {str(e)}"}
+
     def get_address_info(self, address: str) -> Dict[str, Any]:
         """Get address information from Blockfrost API"""
         try:
-            # url = f"{self.base_url}/addresses/{address}"
-            # response = requests.get(url, headers=self.headers)
-            # response.raise_for_status()
-            # return response.json()
-            response = self.api.address(address=address)
-            return response
+            return self._get(f"/addresses/{address}", BLOCKFROST_ADDRESS_TTL)
         except requests.exceptions.RequestException as e:
             return {"error": f"Failed to fetch address info: {str(e)}"}
 
+    def get_address_transactions(self, address: str, count: int = 5, order: str = "desc") -> Any:
+        """Get the latest transactions for an address from Blockfrost API"""
+        try:
+            params = {"count": count, "order": order}
+            return self._get(f"/addresses/{address}/transactions", BLOCKFROST_ADDRESS_TTL, params)
+        except requests.exceptions.RequestException as e:
+            return {"error": f"Failed to fetch address transactions: {str(e)}"}
+
+    def gather(self, *calls: Callable[[], Any]) -> List[Any]:
+        """Run independent lookups concurrently, at most BLOCKFROST_MAX_CONCURRENCY at a time.
+
+        Must not be called from inside another ``gather`` call, which could
+        exhaust the pool while waiting on itself.
+        """
+        if len(calls) <= 1:
+            return [call() for call in calls]
+        # Copy the caller's context so request priority and the trace span carry over to the pool threads
+        futures = [self.fan_out.submit(contextvars.copy_context().run, call) for call in calls]
+        return [future.result() for future in futures]
+
+    def get_transaction_bundle(self, tx_hash: str) -> Dict[str, Any]:
+        """Fetch a transaction, its UTxOs and its metadata in one concurrent round-trip."""
+        tx_data, utxo_data, metadata = self.gather(
+            lambda: self.get_transaction(tx_hash),
+            lambda: self.get_transaction_utxos(tx_hash),
+            lambda: self.get_transaction_metadata(tx_hash),
+        )
+        return {"transaction": tx_data, "utxos": utxo_data, "metadata": metadata}
+
+    def stats(self) -> dict:
+        return {
+            "cache": self.cache.stats(),
+            "rate_limiter": self.limiter.stats(),
+            "retries": self.retries,
+        }
+
+
+def is_error(data: Any) -> bool:
+    return isinstance(data, dict) and "error" in data
+
 # Initialize Blockfrost client
 blockfrost_client = BlockfrostClient()
 
@@ -72,18 +190,18 @@ def get_cardano_transaction(tx_hash: str) -> str:
     if not tx_hash or len(tx_hash) != 64:
         return "Invalid transaction hash. Please provide a 64-character hexadecimal string."
     
-    # Get transaction details
-    tx_data = blockfrost_client.get_transaction(tx_hash)
-    if "error" in tx_data:
+    # Get transaction details, UTXOs and metadata concurrently
+    bundle = blockfrost_client.get_transaction_bundle(tx_hash)
+    tx_data, utxo_data = bundle["transaction"], bundle["utxos"]
+    if is_error(tx_data):
         return f"Error fetching transaction: {tx_data['error']}"
-    
-    # Get UTXOs for input/output details
-    utxo_data = blockfrost_client.get_transaction_utxos(tx_hash)
-    if "error" in utxo_data:
+    if is_error(utxo_data):
         return f"Error fetching UTXOs: {utxo_data['error']}"
     
     # Format the data for better readability
     formatted_data = format_transaction_data(tx_data, utxo_data)
+    if not is_error(bundle["metadata"]):
+        formatted_data += format_transaction_metadata(bundle["metadata"])
     return formatted_data
 
 @tool
@@ -101,7 +219,7 @@ def get_cardano_address_info(address: str) -> str:
         return "Invalid address. Please provide a valid Cardano address."
     
     address_data = blockfrost_client.get_address_info(address)
-    if "error" in address_data:
+    if is_error(address_data):
         return f"Error fetching address info: {address_data['error']}"
     
     # Format address data
@@ -129,25 +247,23 @@ def analyze_transaction_flow(tx_hash: str) -> str:
     if not tx_hash or len(tx_hash) != 64:
         return "Invalid transaction hash. Please provide a 64-character hexadecimal string."
     
-    # Get transaction and UTXO data
-    tx_data = blockfrost_client.get_transaction(tx_hash)
-    utxo_data = blockfrost_client.get_transaction_utxos(tx_hash)
+    # Get transaction and UTXO data concurrently
+    tx_data, utxo_data = blockfrost_client.gather(
+        lambda: blockfrost_client.get_transaction(tx_hash),
+        lambda: blockfrost_client.get_transaction_utxos(tx_hash),
+    )
     
-    if "error" in tx_data or "error" in utxo_data:
+    if is_error(tx_data) or is_error(utxo_data):
         return "Error fetching transaction data for analysis."
     
     analysis = format_utxo_data(utxo_data)
     return analysis
 
 def pull_the_data_from_blockfrost_api(adderss: str):
-    api = BlockFrostApi(
-            project_id=BLOCKFROST_PROJECT_ID,
-            base_url=ApiUrls.preview.value
-        )
-    
     output = ""
-    transaction = api.address(address=adderss)
-    transaction = namespace_to_dict(transaction)
+    transaction = blockfrost_client.get_address_info(adderss)
+    if is_error(transaction):
+        raise RuntimeError(transaction["error"])
 
     output += f"Address: {transaction['address']}\n"
     output += f"Stake Address: {transaction['stake_address']}\n"
@@ -224,19 +340,11 @@ def fun_get_first_hash_from_cbor_hex(cbor_hex: str) -> str:
 
 ## transaction history tool
 
-def namespace_to_dict(ns):
-    """Recursively convert Namespace/SimpleNamespace to dict."""
-    if isinstance(ns, (SimpleNamespace,)):
-        return {k: namespace_to_dict(v) for k, v in vars(ns).items()}
-    elif isinstance(ns, list):
-        return [namespace_to_dict(i) for i in ns]
-    else:
-        return ns
-
 @tool
 def get_transactions_for_address(address: str) -> str:
     """
-    Get transactions for a given Cardano address.
+    Get the latest transactions for a given Cardano address, including each
+    transaction's block height, fee and total output.
     
     Args:
         address (str): The Cardano address to query.
@@ -250,27 +358,37 @@ def get_transactions_for_address(address: str) -> str:
         print("get_transactios_for_address tool triggered")
         print("=====================")
         return details
-    except ApiError as e:
+    except Exception as e:
         return f"Error fetching transactions: {e}"
     
-def get_transactions_details(address: str) -> str:
-    output = "Latest 5 transactions for address:\n"
+def get_transactions_details(address: str, count: int = BLOCKFROST_HISTORY_COUNT) -> str:
+    output = f"Latest {count} transactions for address:\n"
 
-    try:
-        transactions = blockfrost_client.api.address_transactions(address=address, count=5, order="desc")
-        transactions = namespace_to_dict(transactions)
-
-        for tx in transactions:
-            tx_hash = tx['tx_hash']
-            timestamp = tx['block_time']
-            readable_time = datetime.fromtimestamp(timestamp)
-            output += f"Transaction Hash: {tx_hash}\n"
-            output += f"Timestamp: {readable_time}\n"
-            output += "-" * 50 + "\n"
-
-        return output if output else "No transactions found for this address."
-    except ApiError as e:
-        return f"Error fetching transactions: {e}"
+    transactions = blockfrost_client.get_address_transactions(address, count=count, order="desc")
+    if is_error(transactions):
+        return f"Error fetching transactions: {transactions['error']}"
+
+    # Fetch every listed transaction's details in one concurrent round-trip
+    details = blockfrost_client.gather(*[
+        (lambda tx_hash=tx['tx_hash']: blockfrost_client.get_transaction(tx_hash))
+        for tx in transactions
+    ])
+
+    for tx, tx_data in zip(transactions, details):
+        tx_hash = tx['tx_hash']
+        timestamp = tx['block_time']
+        readable_time = datetime.fromtimestamp(timestamp)
+        output += f"Transaction Hash: {tx_hash}\n"
+        output += f"Timestamp: {readable_time}\n"
+        if not is_error(tx_data):
+            lovelace = next((int(amt['quantity']) for amt in tx_data.get('output_amount', []) if amt['unit'] == 'lovelace'), 0)
+            output += f"Block Height: {tx_data.get('block_height', 'N/A')}\n"
+            output += f"Fee: {int(tx_data.get('fees', 0)) / 1_000_000:.6f} ADA\n"
+            output += f"Total Output: {lovelace / 1_000_000:.6f} ADA\n"
+            output += f"Inputs/Outputs: {tx_data.get('utxo_count', 'N/A')} UTxOs\n"
+        output += "-" * 50 + "\n"
+
+    return output if transactions else "No transactions found for this address."
     
 @tool
 def get_single_transaction_details(tx_hash: str) -> dict:
@@ -290,21 +408,18 @@ def get_single_transaction_details(tx_hash: str) -> dict:
         print("get_single_transaction_details tool triggered")
         print("=====================")
         return f"transaction details: {tx_details}"
-    except ApiError as e:
+    except Exception as e:
         return {"error": f"Failed to fetch transaction details: {str(e)}"}
     
 def get_transactions_details_with_format(tx_hash: str) -> dict:
     """Get formatted transaction details from Blockfrost API."""
-    try:
-        tx = blockfrost_client.api.transaction(tx_hash)
-        tx_dict = namespace_to_dict(tx)
-        format_data = {
-            "hash": tx_dict.get("hash"),
-            "time": datetime.fromtimestamp(tx_dict.get("block_time")).isoformat(),
-            "fee": tx_dict.get("fees"),
-            "Change ADA amount": float(tx_dict.get("output_amount")[0].get("quantity"))/1000000
-        }
-        return format_data
-
-    except ApiError as e:
-        return {"error": f"Failed to fetch transaction details: {str(e)}"}
\ No newline at end of file
+    tx_dict = blockfrost_client.get_transaction(tx_hash)
+    if is_error(tx_dict):
+        return tx_dict
+    format_data = {
+        "hash": tx_dict.get("hash"),
+        "time": datetime.fromtimestamp(tx_dict.get("block_time")).isoformat(),
+        "fee": tx_dict.get("fees"),
+        "Change ADA amount": float(tx_dict.get("output_amount")[0].get("quantity"))/1000000
+    }
+    return format_data
\ No newline at end of file
@@ -1,36 +1,9 @@
 from langchain_core.tools import tool
-from langchain_chroma import Chroma
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_core.documents import Document
-from typing import List
-from app.core.config import GOOGLE_API_KEY, GEMINI_EMBEDDING_MODEL
+from app.utils.knowledge_registry import knowledge_registry
 
 
-class KnowledgeBaseClient:
-    def __init__(self):
-        self.db_path = './db/cardano'
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model=GEMINI_EMBEDDING_MODEL,
-            google_api_key=GOOGLE_API_KEY
-        )
-        self.vector_store = Chroma(
-            persist_directory=self.db_path,
-            embedding_function=self.embeddings
-        )
-        self.retriever = self.vector_store.as_retriever(k=2)
-    
-    def search_knowledge_base(self, query: str) -> List[Document]:
-        """Search the knowledge base for relevant documents"""
-        try:
-            docs = self.retriever.invoke(query)
-            # debugging: print the documents found
-            print(docs)
-            return docs
-        except Exception as e:
-            return [Document(page_content=f"Error searching knowledge base: {str(e)}")]
-
 # Initialize knowledge base client
-kb_client = KnowledgeBaseClient()
+kb_client = knowledge_registry.client("cardano")
 
 @tool
 def search_cardano_knowledge(query: str) -> str:
@@ -1,85 +1,57 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from langchain_core.tools import tool
-from langchain_chroma import Chroma
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_core.documents import Document
-from typing import List
-from app.core.config import GOOGLE_API_KEY, GEMINI_EMBEDDING_MODEL
-
-class LegalPropertyKnowledgeBaseClient:
-    def __init__(self):
-        self.db_path = './db/property_law'
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model=GEMINI_EMBEDDING_MODEL,
-            google_api_key=GOOGLE_API_KEY
-        )
-        self.vector_store = Chroma(
-            persist_directory=self.db_path,
-            embedding_function=self.embeddings
-        )
-        self.retriever = self.vector_store.as_retriever(k=4)
-    
-    def search_knowledge_base(self, query: str) -> List[Document]:
-        """Search the knowledge base for relevant documents"""
-        try:
-            docs = self.retriever.invoke(query)
-            # debugging: print the documents found
-            print(docs)
-            return docs
-        except Exception as e:
-            return [Document(page_content=f"Error searching knowledge base: {str(e)}")]
-        
-
-class CivilLawKnowledgeBaseClient:
-    def __init__(self):
-        self.db_path = './db/civil_law'
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model=GEMINI_EMBEDDING_MODEL,
-            google_api_key=GOOGLE_API_KEY
-        )
-        self.vector_store = Chroma(
-            persist_directory=self.db_path,
-            embedding_function=self.embeddings
-        )
-        self.retriever = self.vector_store.as_retriever(k=4)
-    
-    def search_knowledge_base(self, query: str) -> List[Document]:
-        """Search the knowledge base for relevant documents"""
-        try:
-            docs = self.retriever.invoke(query)
-            # debugging: print the documents found
-            print(docs)
-            return docs
-        except Exception as e:
-            return [Document(page_content=f"Error searching knowledge base: {str(e)}")]
-        
-
-class CorporateLawKnowledgeBaseClient:
-    def __init__(self):
-        self.db_path = './db/corporate_law'
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model=GEMINI_EMBEDDING_MODEL,
-            google_api_key=GOOGLE_API_KEY
-        )
-        self.vector_store = Chroma(
-            persist_directory=self.db_path,
-            embedding_function=self.embeddings
-        )
-        self.retriever = self.vector_store.as_retriever(k=4)
-    
-    def search_knowledge_base(self, query: str) -> List[Document]:
-        """Search the knowledge base for relevant documents"""
-        try:
-            docs = self.retriever.invoke(query)
-            # debugging: print the documents found
-            print(docs)
-            return docs
-        except Exception as e:
-            return [Document(page_content=f"Error searching knowledge base: {str(e)}")]
+from typing import Dict, List
+from app.core.config import AGENT_MAX_WORKERS, LEGAL_FUSION_TOP_K, LEGAL_FUSION_RRF_K, LEGAL_CHUNK_TOKENS
+from app.utils.knowledge_registry import knowledge_registry
+from app.utils.legal_splitter import CHARS_PER_TOKEN, legal_citation
+from app.utils.rank_fusion import reciprocal_rank_fusion
+
+import logging
+logger = logging.getLogger(__name__)
 
 # Initialize knowledge base client
-lp_client = LegalPropertyKnowledgeBaseClient()
-cl_client = CivilLawKnowledgeBaseClient()
-co_client = CorporateLawKnowledgeBaseClient()
+lp_client = knowledge_registry.client("property_law")
+cl_client = knowledge_registry.client("civil_law")
+co_client = knowledge_registry.client("corporate_law")
+
+# Stores searched together by search_all_legal_knowledge
+legal_clients = {
+    "property law": lp_client,
+    "civil law": cl_client,
+    "corporate law": co_client,
+}
+# Shared by every agent worker: room for each concurrent agent run to search all stores at once
+_search_pool = ThreadPoolExecutor(max_workers=AGENT_MAX_WORKERS * len(legal_clients), thread_name_prefix="legal-search")
+
+def search_all_stores(query: str) -> Dict[str, List[Document]]:
+    """Search every legal store concurrently; failed stores are left out."""
+    futures = {
+        domain: _search_pool.submit(contextvars.copy_context().run, client.search_knowledge_base, query)
+        for domain, client in legal_clients.items()
+    }
+    ranked = {}
+    for domain, future in futures.items():
+        docs = future.result()
+        if docs and docs[0].page_content.startswith("Error searching knowledge base"):
+            logger.warning(f"{domain} search failed: {docs[0].page_content}")
+            continue
+        ranked[domain] = docs
+    return ranked
+
+def format_result(title: str, doc: Document, domains: str = "") -> str:
+    """
+    One search result with its citation. Section-level chunks are already
+    within the chunk budget and are returned whole; anything else is cut
+    at 500 characters.
+    """
+    citation = legal_citation(doc.metadata)
+    limit = LEGAL_CHUNK_TOKENS * CHARS_PER_TOKEN if citation else 500
+    content = doc.page_content[:limit] + "..." if len(doc.page_content) > limit else doc.page_content
+    source = "; ".join(part for part in (citation, domains) if part)
+    header = f"**{title}** ({source}):" if source else f"**{title}:**"
+    return f"{header}\n{content}"
 
 @tool
 def search_legal_property_law_knowledge(query: str) -> str:
@@ -102,10 +74,7 @@ def search_legal_property_law_knowledge(query: str) -> str:
         return "No relevant information found in the knowledge base."
     
     # Format results
-    results = []
-    for i, doc in enumerate(docs, 1):
-        content = doc.page_content[:500] + "..." if len(doc.page_content) > 500 else doc.page_content
-        results.append(f"**Result {i}:**\n{content}")
+    results = [format_result(f"Result {i}", doc) for i, doc in enumerate(docs, 1)]
     
     return "\n\n".join(results)
 
@@ -131,10 +100,7 @@ def search_civil_law_knowledge(query: str) -> str:
         return "No relevant information found in the knowledge base."
     
     # Format results
-    results = []
-    for i, doc in enumerate(docs, 1):
-        content = doc.page_content[:500] + "..." if len(doc.page_content) > 500 else doc.page_content
-        results.append(f"**Result {i}:**\n{content}")
+    results = [format_result(f"Result {i}", doc) for i, doc in enumerate(docs, 1)]
     
     return "\n\n".join(results)
 
@@ -160,11 +126,36 @@ def search_corporate_law_knowledge(query: str) -> str:
         return "No relevant information found in the knowledge base."
     
     # Format results
-    results = []
-    for i, doc in enumerate(docs, 1):
-        content = doc.page_content[:500] + "..." if len(doc.page_content) > 500 else doc.page_content
-        results.append(f"**Result {i}:**\n{content}")
+    results = [format_result(f"Result {i}", doc) for i, doc in enumerate(docs, 1)]
     
     return "\n\n".join(results)
 
 
+
+
+@tool
+def search_all_legal_knowledge(query: str) -> str:
+    """
+    Search the property law, civil law and corporate law knowledge bases at once
+    and return one ranked list of results. Use this for questions that span
+    several areas of law, e.g. a company owning or leasing land.
+    Args:
+        query (str): The search query to find relevant legal information.
+    Returns:
+        str: A formatted string containing the merged search results or an error message.
+    """
+    if not query:
+        return "Please provide a search query."
+
+    fused = reciprocal_rank_fusion(search_all_stores(query), k=LEGAL_FUSION_RRF_K)[:LEGAL_FUSION_TOP_K]
+    logger.info(f"all legal knowledge tool returned {len(fused)} results")
+
+    if not fused:
+        return "No relevant information found in the knowledge base."
+
+    # Format results
+    results = []
+    for i, (doc, _, domains) in enumerate(fused, 1):
+        results.append(format_result(f"Result {i}", doc, ", ".join(domains)))
+
+    return "\n\n".join(results)